@@ -0,0 +1,232 @@
+# lib/chart_atlas.py
+# 차트 기호 사전(3페이지)용 시트별 스프라이트 아틀라스
+#
+# 사용법:
+#   python -m lib.chart_atlas        # manifest.json 기준으로 아틀라스 생성/갱신
+#
+# - 시트마다 아이콘을 표시 폭(DISPLAY_WIDTH)의 SCALE배 폭으로 맞춰 세로로 이어 붙인 PNG 한 장 (256색)
+# - assets/chart_from_excel/atlas/index.json 에 시트별 파일/아이콘 위치(y, 높이)와
+#   원본 manifest 해시, 원본 이미지 크기/해시와 (mtime, 크기)를 기록
+# - 페이지는 load_atlas()로 읽어 CSS background-position 으로 잘라 표시
+#   (manifest 나 원본 이미지가 바뀐 시트는 빠짐 → 원본 이미지로 표시)
+#   원본 이미지는 (mtime, 크기)가 기록과 다를 때만 해시를 비교
+
+import io
+import json
+import base64
+import hashlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+from lib.chart_manifest import MANIFEST_PATH, ChartManifest, ChartSheet, load_manifest
+
+ATLAS_VERSION = 2
+ATLAS_DIR = MANIFEST_PATH.parent / "atlas"
+INDEX_PATH = ATLAS_DIR / "index.json"
+
+DISPLAY_WIDTH = 110     # 페이지에서 보이는 아이콘 폭(px)
+SCALE = 2               # 고해상도 화면용 배율
+
+
+class SheetAtlas(NamedTuple):
+    path: Path
+    height: int                             # 표시 기준(px) 전체 높이
+    offsets: Dict[str, Tuple[int, int]]     # 파일명 -> (y, 높이) 표시 기준(px)
+
+
+# -----------------------------------------------------------------------------
+# 빌드
+# -----------------------------------------------------------------------------
+def _stamp(path: Path) -> Optional[List[int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _fingerprint(path: Path) -> Optional[List]:
+    """[크기, sha1] — 저장소를 새로 받아 mtime 이 달라져도 내용이 같으면 같은 값"""
+    try:
+        raw = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    return [len(raw), hashlib.sha1(raw).hexdigest()]
+
+
+# 원본 경로 -> ((mtime_ns, 크기), [크기, sha1]) — 같은 파일을 두 번 해시하지 않도록
+_SOURCE_FP: Dict[Path, Tuple[Tuple[int, ...], Optional[List]]] = {}
+
+
+def _same_source(path: Path, stamp: Optional[Tuple[int, ...]], fp: Optional[List],
+                 built: Optional[List[int]]) -> bool:
+    """
+    stamp: 지금 (mtime, 크기) / fp: 빌드 때 [크기, sha1] / built: 빌드 때 (mtime, 크기)
+    mtime/크기가 빌드 때와 같으면 그대로, 크기만 같으면 해시 비교
+    """
+    if fp is None:
+        return stamp is None
+    if stamp is None or stamp[1] != fp[0]:
+        return False
+    if built is not None and tuple(built) == stamp:
+        return True
+    hit = _SOURCE_FP.get(path)
+    if hit is None or hit[0] != stamp:
+        hit = _SOURCE_FP[path] = (stamp, _fingerprint(path))
+    return hit[1] == fp
+
+
+def _build_sheet(sheet: ChartSheet, out: Path) -> Optional[dict]:
+    width = DISPLAY_WIDTH * SCALE
+    tiles: List[Tuple[str, Image.Image]] = []
+    sources: Dict[str, Optional[List]] = {}
+    stamps: Dict[str, Optional[List[int]]] = {}
+
+    for it in sheet.items:
+        if not it.file or it.file in sources:
+            continue
+        stamps[it.file] = _stamp(it.path)
+        sources[it.file] = _fingerprint(it.path)
+        if sources[it.file] is None:
+            continue
+        try:
+            with Image.open(it.path) as img:
+                img = img.convert("RGBA")
+                h = max(1, round(img.height * width / img.width))
+                tile = img.resize((width, h), Image.LANCZOS)
+        except Exception:
+            continue
+        # 높이를 SCALE 배수로 (아래쪽 투명 여백) → 표시 기준 y/높이가 나눗셈 오차 없이 맞음
+        if h % SCALE:
+            padded = Image.new("RGBA", (width, h + SCALE - h % SCALE), (0, 0, 0, 0))
+            padded.paste(tile, (0, 0))
+            tile = padded
+        tiles.append((it.file, tile))
+
+    if not tiles:
+        return None
+
+    total = sum(t.height for _, t in tiles)
+    atlas = Image.new("RGBA", (width, total), (0, 0, 0, 0))
+    offsets: Dict[str, List[int]] = {}
+    y = 0
+    for file, tile in tiles:
+        atlas.paste(tile, (0, y))
+        offsets[file] = [y // SCALE, tile.height // SCALE]
+        y += tile.height
+
+    # 선 위주 아이콘이라 256색 팔레트로 충분 (용량 1/5 수준)
+    atlas = atlas.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+    buf = io.BytesIO()
+    atlas.save(buf, "PNG", optimize=True)
+    tmp = out.with_suffix(".png.tmp")
+    tmp.write_bytes(buf.getvalue())
+    tmp.replace(out)
+
+    return {
+        "file": out.name,
+        "height": total // SCALE,
+        "items": offsets,
+        "sources": sources,
+        "stamps": stamps,
+    }
+
+
+def build_atlas(manifest: Optional[ChartManifest] = None) -> dict:
+    """시트별 아틀라스 PNG + index.json 생성, index 반환"""
+    manifest = manifest or load_manifest()
+    ATLAS_DIR.mkdir(parents=True, exist_ok=True)
+
+    sheets = {}
+    for i, sheet in enumerate(manifest.sheets.values()):
+        entry = _build_sheet(sheet, ATLAS_DIR / f"sheet_{i:02d}.png")
+        if entry is not None:
+            sheets[sheet.title] = entry
+
+    index = {
+        "version": ATLAS_VERSION,
+        "manifest": manifest.digest,
+        "display_width": DISPLAY_WIDTH,
+        "scale": SCALE,
+        "sheets": sheets,
+    }
+    tmp = INDEX_PATH.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(INDEX_PATH)
+    return index
+
+
+# -----------------------------------------------------------------------------
+# 로드
+# -----------------------------------------------------------------------------
+# (index stamp, manifest 해시, 원본 이미지 stamp들) -> 시트별 아틀라스 (쓸 수 없는 시트는 빠짐)
+_LOADED: Dict[Tuple, Dict[str, SheetAtlas]] = {}
+# (png 경로, stamp) -> data URI
+_URIS: Dict[Tuple, str] = {}
+
+
+def load_atlas(manifest: ChartManifest) -> Dict[str, SheetAtlas]:
+    """
+    현재 manifest 와 맞는 시트 아틀라스 {시트명: SheetAtlas}
+    index 가 없거나 manifest 해시가 다르면 {} / 원본 이미지가 바뀐 시트는 제외
+    """
+    stamp = _stamp(INDEX_PATH)
+    if stamp is None:
+        return {}
+    # 원본 이미지는 stat 만 (재실행마다 해시하지 않음)
+    sources = {it.path: tuple(_stamp(it.path) or ()) or None for it in manifest.items if it.file}
+    cache_key = (tuple(stamp), manifest.digest, tuple(sources.items()))
+    hit = _LOADED.get(cache_key)
+    if hit is not None:
+        return hit
+
+    try:
+        index = json.loads(INDEX_PATH.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+    out: Dict[str, SheetAtlas] = {}
+    if (index.get("version") == ATLAS_VERSION
+            and index.get("manifest") == manifest.digest
+            and index.get("display_width") == DISPLAY_WIDTH):
+        for title, entry in index.get("sheets", {}).items():
+            sheet = manifest.sheets.get(title)
+            path = ATLAS_DIR / entry["file"]
+            if sheet is None or not path.exists():
+                continue
+            # 원본 이미지가 바뀌었으면 이 시트는 원본으로 표시 (mtime/크기 → 해시 순으로 확인)
+            built = entry.get("stamps", {})
+            if any(not _same_source(it.path, sources[it.path], entry["sources"].get(it.file), built.get(it.file))
+                   for it in sheet.items if it.file):
+                continue
+            out[title] = SheetAtlas(
+                path, entry["height"], {f: (y, h) for f, (y, h) in entry["items"].items()}
+            )
+
+    _LOADED.clear()
+    _LOADED[cache_key] = out
+    return out
+
+
+def data_uri(atlas: SheetAtlas) -> str:
+    """아틀라스 PNG → data URI (파일이 바뀌지 않으면 한 번만 인코딩)"""
+    key = (atlas.path, tuple(_stamp(atlas.path) or ()))
+    uri = _URIS.get(key)
+    if uri is None:
+        encoded = base64.b64encode(atlas.path.read_bytes()).decode("ascii")
+        uri = _URIS[key] = f"data:image/png;base64,{encoded}"
+    return uri
+
+
+def main() -> None:
+    index = build_atlas()
+    n_items = sum(len(s["items"]) for s in index["sheets"].values())
+    size = sum((ATLAS_DIR / s["file"]).stat().st_size for s in index["sheets"].values())
+    print(f"✅ 시트 {len(index['sheets'])}개, 아이콘 {n_items}개 → 아틀라스 {size / 1024:.0f}KB")
+    print(f"📝 저장: {INDEX_PATH}")
+
+
+if __name__ == "__main__":
+    main()
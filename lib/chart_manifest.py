@@ -0,0 +1,191 @@
+# lib/chart_manifest.py
+# 엑셀에서 추출한 차트 기호 매니페스트(assets/chart_from_excel/manifest.json) 공용 로더
+#
+# - 파일을 한 번만 읽어 형식 검사 → 시트 순서(SHEET_ORDER) 적용 → 표시용 이름(clean_name)까지 미리 계산
+# - 시트별 인덱스 / 전체 항목 목록 / 이미지 절대 경로 제공
+# - 파일 mtime/크기가 바뀌면 해시를 비교해 내용이 달라진 경우에만 다시 만듦
+#   (페이지 재실행마다 JSON 작업 없음)
+
+import re
+import json
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+MANIFEST_PATH = ROOT / "assets" / "chart_from_excel" / "manifest.json"
+
+# 엑셀 시트 순서 고정 (목록에 없는 시트는 뒤에 원래 순서대로)
+SHEET_ORDER = [
+    "1코 기호",
+    "1코 2단 기호",
+    "2코 교차뜨기",
+    "3코 교차뜨기",
+    "4코 교차뜨기",
+    "5코 교차뜨기",
+    "6코 교차뜨기",
+    "7코 교차뜨기",
+    "8코 교차뜨기",
+    "10코 교차뜨기",
+    "3코 방울뜨기",
+    "5코 방울뜨기",
+    "교차뜨기 일본식 기호",
+    "노트뜨기",
+]
+
+
+class ManifestError(ValueError):
+    """manifest.json 형식 오류"""
+
+
+class ChartItem(NamedTuple):
+    sheet: str
+    file: str
+    abbr: str           # 엑셀상의 이름 (원문, 앞뒤 공백 제거)
+    desc: str
+    name: str           # clean_name(abbr)
+    label: str          # 화면 표시용 "이름 (설명)"
+    path: Path          # 이미지 절대 경로
+
+
+class ChartSheet(NamedTuple):
+    title: str
+    img_dir: Path
+    items: Tuple[ChartItem, ...]
+
+
+def clean_name(raw: str) -> str:
+    """
+    예)
+      'chart_001.png (겉뜨기)' → '겉뜨기'
+      'chart_022.png(M1R)'     → 'M1R'
+      'SSK(오른코 겹쳐 2코 모아뜨기)' → 'SSK(오른코 겹쳐 2코 모아뜨기)' (chart_XXX 없으면 그대로)
+    """
+    if not raw:
+        return ""
+
+    # 1) chart_000.png 부분 제거
+    s = re.sub(r"chart_\d+\.png\s*", "", raw).strip()
+
+    # 2) 남은 게 괄호만 있으면 괄호 제거
+    if s.startswith("(") and s.endswith(")"):
+        s = s[1:-1].strip()
+
+    return s
+
+
+def _label(name: str, desc: str) -> str:
+    if name and desc and desc != name:
+        return f"{name} ({desc})"
+    return name or desc
+
+
+def validate(data: Any) -> None:
+    """
+    형식 검사 (틀리면 ManifestError)
+    {시트명: {"img_dir": str, "items": [{"file": str, "abbr": str, "desc": str}, ...]}, ...}
+    """
+    if not isinstance(data, dict):
+        raise ManifestError("manifest 최상위는 {시트명: 정보} 객체여야 합니다.")
+    for sheet, info in data.items():
+        if not isinstance(info, dict):
+            raise ManifestError(f"[{sheet}] 시트 정보가 객체가 아닙니다.")
+        if not isinstance(info.get("img_dir", ""), str):
+            raise ManifestError(f"[{sheet}] img_dir 은 문자열이어야 합니다.")
+        items = info.get("items", [])
+        if not isinstance(items, list):
+            raise ManifestError(f"[{sheet}] items 는 목록이어야 합니다.")
+        for i, it in enumerate(items):
+            if not isinstance(it, dict):
+                raise ManifestError(f"[{sheet}] items[{i}] 가 객체가 아닙니다.")
+            for field in ("file", "abbr", "desc"):
+                if not isinstance(it.get(field) or "", str):
+                    raise ManifestError(f"[{sheet}] items[{i}].{field} 는 문자열이어야 합니다.")
+
+
+def _resolve_img_dir(img_dir: str, manifest_path: Path) -> Path:
+    """img_dir: 절대 경로 / 프로젝트 루트 기준 / manifest 폴더 기준 순으로 확인"""
+    p = Path(img_dir)
+    if p.is_absolute():
+        return p
+    for base in (ROOT, manifest_path.parent):
+        if (base / p).is_dir():
+            return base / p
+    return ROOT / p
+
+
+class ChartManifest:
+    """검사/정렬/이름 정리까지 끝난 매니페스트"""
+
+    def __init__(self, data: Dict[str, Any], digest: str, path: Path = MANIFEST_PATH):
+        validate(data)
+        self.digest = digest
+        self.raw = data
+
+        order = [s for s in SHEET_ORDER if s in data] + [s for s in data if s not in SHEET_ORDER]
+        self.sheets: Dict[str, ChartSheet] = {}
+        for title in order:
+            info = data[title]
+            img_dir = _resolve_img_dir(info.get("img_dir", ""), path)
+            items = []
+            for it in info.get("items", []):
+                abbr = (it.get("abbr") or "").strip()
+                desc = (it.get("desc") or "").strip()
+                name = clean_name(abbr)
+                file = it.get("file") or ""
+                items.append(ChartItem(title, file, abbr, desc, name, _label(name, desc), img_dir / file))
+            self.sheets[title] = ChartSheet(title, img_dir, tuple(items))
+
+        self.sheet_names: List[str] = list(self.sheets)
+        self.items: Tuple[ChartItem, ...] = tuple(it for s in self.sheets.values() for it in s.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def names(self) -> List[str]:
+        """프롬프트용 차트 기호 이름 목록 (정렬, 더미 제외)"""
+        return sorted({
+            it.abbr for it in self.items
+            if it.abbr and not it.abbr.startswith("__dummy__")
+        })
+
+
+# -----------------------------------------------------------------------------
+# 로드 (경로별 캐시)
+# -----------------------------------------------------------------------------
+# 경로 -> ((mtime_ns, 크기), 매니페스트)
+_CACHE: Dict[Path, Tuple[Tuple[int, int], ChartManifest]] = {}
+
+_EMPTY_DIGEST = hashlib.sha1(b"").hexdigest()
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> ChartManifest:
+    """
+    매니페스트 반환 (파일이 없으면 빈 매니페스트)
+    mtime/크기가 같으면 그대로, 다르면 해시가 바뀐 경우에만 다시 만듦
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        _CACHE.pop(path, None)
+        return ChartManifest({}, _EMPTY_DIGEST, path)
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    hit = _CACHE.get(path)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+
+    raw = path.read_bytes()
+    digest = hashlib.sha1(raw).hexdigest()
+    if hit is not None and hit[1].digest == digest:
+        _CACHE[path] = (stamp, hit[1])
+        return hit[1]
+
+    try:
+        data = json.loads(raw.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ManifestError(f"manifest.json 을 읽을 수 없습니다: {e}") from e
+    manifest = ChartManifest(data, digest, path)
+    _CACHE[path] = (stamp, manifest)
+    return manifest
+
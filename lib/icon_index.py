@@ -0,0 +1,248 @@
+# lib/icon_index.py
+# 차트 아이콘 이미지 유사도 검색 인덱스
+#
+# - 아이콘마다 64x64 흑백 → 정규화 벡터(4096차원)로 만들어 float32 행렬 하나로 쌓음
+# - 메타데이터(시트/이름/설명/파일/경로)는 같은 순서의 numpy 구조체 배열
+# - 검색: 행렬 × 벡터 한 번 + np.argpartition 으로 상위 k개만 정렬
+#   여러 장을 한꺼번에 찾을 때는 행렬 × 행렬 한 번
+# - load_icon_index(): 디스크에 저장해 둔 인덱스 사용 (서버를 새로 띄워도 이미지를 다시 읽지 않음)
+#   · lib/icon_index.<키>.npy  벡터 행렬 (memory-map 으로 열어 여러 프로세스가 OS 캐시 공유)
+#   · lib/icon_index.meta.npz  메타데이터 + 이미지별 (mtime, 크기) + 키(manifest 해시 + 이미지 상태)
+#                              + 짝이 되는 행렬 파일 이름
+#     행렬 파일 이름에 키가 들어가므로 저장 도중에 읽어도 다른 저장본의 행렬과 섞이지 않음
+#   · 키가 다르면 바뀐 이미지만 다시 벡터화해서 저장
+
+import os
+import hashlib
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from lib.chart_manifest import ROOT, ChartManifest
+
+LIB_DIR = Path(__file__).resolve().parent
+MATRIX_PATH = LIB_DIR / "icon_index.npy"     # 실제 파일은 icon_index.<키>.npy
+META_PATH = LIB_DIR / "icon_index.meta.npz"
+INDEX_VERSION = 2
+
+FEATURE_SIZE = (64, 64)
+FEATURE_DIM = FEATURE_SIZE[0] * FEATURE_SIZE[1]
+
+META_FIELDS = ("sheet", "abbr", "desc", "file", "path")
+
+Match = Tuple[float, Dict[str, Any]]
+
+
+def icon_vector(img: Image.Image) -> np.ndarray:
+    """이미지 → 64x64 흑백 → 길이 1로 정규화한 float32 벡터"""
+    img_resized = ImageOps.fit(img.convert("L"), FEATURE_SIZE)
+    vec = (np.asarray(img_resized, dtype=np.float32) / 255.0).reshape(-1)
+    norm = float(np.linalg.norm(vec)) or 1.0
+    return vec / norm
+
+
+def _meta_array(rows: List[Tuple[str, ...]]) -> np.ndarray:
+    widths = [max([len(r[i]) for r in rows] + [1]) for i in range(len(META_FIELDS))]
+    dtype = [(name, f"U{w}") for name, w in zip(META_FIELDS, widths)]
+    return np.array(rows, dtype=dtype)
+
+
+class IconIndex:
+    """
+    matrix: (아이콘 수, 4096) float32, 행마다 길이 1 → 내적 = 코사인 유사도
+    meta  : 같은 순서의 구조체 배열 (sheet, abbr, desc, file, path[프로젝트 기준 상대경로])
+    """
+
+    def __init__(self, matrix: np.ndarray, meta: np.ndarray):
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32).reshape(-1, FEATURE_DIM)
+        self.meta = meta
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def icon(self, i: int) -> Dict[str, Any]:
+        row = self.meta[i]
+        return {name: str(row[name]) for name in META_FIELDS}
+
+    def _top(self, scores: np.ndarray, topk: int) -> List[Match]:
+        k = min(topk, scores.shape[0])
+        if k <= 0:
+            return []
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+        return [(float(scores[i]), self.icon(int(i))) for i in idx]
+
+    def query(self, vec: np.ndarray, topk: int = 5) -> List[Match]:
+        """벡터 하나 → [(유사도, 아이콘 정보), ...] 점수 내림차순"""
+        if not len(self):
+            return []
+        return self._top(self.matrix @ vec.astype(np.float32, copy=False), topk)
+
+    def query_batch(self, vecs: np.ndarray, topk: int = 5) -> List[List[Match]]:
+        """벡터 여러 개 (m, 4096) → 행렬 곱 한 번으로 각각의 상위 topk"""
+        vecs = np.asarray(vecs, dtype=np.float32).reshape(-1, FEATURE_DIM)
+        if not len(self):
+            return [[] for _ in range(vecs.shape[0])]
+        scores = vecs @ self.matrix.T
+        return [self._top(row, topk) for row in scores]
+
+    def search(self, img: Image.Image, topk: int = 5) -> List[Match]:
+        return self.query(icon_vector(img), topk)
+
+    def search_many(self, imgs: Iterable[Image.Image], topk: int = 5) -> List[List[Match]]:
+        imgs = list(imgs)
+        if not imgs:
+            return []
+        return self.query_batch(np.stack([icon_vector(im) for im in imgs]), topk)
+
+
+def _rel_path(path: Path) -> str:
+    try:
+        return str(path.relative_to(ROOT))
+    except ValueError:
+        return str(path)
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return (-1, -1)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _build(manifest: ChartManifest, reuse: Optional[Dict[Tuple[str, Tuple[int, int]], np.ndarray]] = None):
+    """
+    return: (인덱스, 행별 (mtime, 크기))
+    reuse: {(상대경로, (mtime, 크기)): 벡터} → 그대로면 이미지를 다시 읽지 않음
+    """
+    vecs: List[np.ndarray] = []
+    rows: List[Tuple[str, ...]] = []
+    stamps: List[Tuple[int, int]] = []
+
+    for it in manifest.items:
+        if not it.file or not it.path.exists():
+            continue
+        rel = _rel_path(it.path)
+        stamp = _stamp(it.path)
+        vec = reuse.get((rel, stamp)) if reuse else None
+        if vec is None:
+            try:
+                with Image.open(it.path) as img:
+                    vec = icon_vector(img)
+            except Exception:
+                continue
+        vecs.append(vec)
+        rows.append((it.sheet, it.abbr, it.desc, it.file, rel))
+        stamps.append(stamp)
+
+    matrix = np.stack(vecs) if vecs else np.zeros((0, FEATURE_DIM), dtype=np.float32)
+    return IconIndex(matrix, _meta_array(rows)), stamps
+
+
+def build_icon_index(manifest: ChartManifest) -> IconIndex:
+    """매니페스트의 모든 아이콘 PNG를 읽어 인덱스 생성 (읽을 수 없는 이미지는 건너뜀)"""
+    return _build(manifest)[0]
+
+
+# -----------------------------------------------------------------------------
+# 디스크 저장 / 로드
+# -----------------------------------------------------------------------------
+def index_key(manifest: ChartManifest) -> str:
+    """manifest 해시 + 모든 아이콘 이미지 (mtime, 크기) → 인덱스 키"""
+    h = hashlib.sha1(f"{INDEX_VERSION}:{manifest.digest}".encode())
+    for it in manifest.items:
+        if it.file:
+            h.update(f"\0{it.path}\0{_stamp(it.path)}".encode())
+    return h.hexdigest()
+
+
+def _matrix_file(matrix_path: Path, key: str) -> Path:
+    """키별 행렬 파일: icon_index.npy → icon_index.<키 앞 16자>.npy"""
+    return matrix_path.with_name(f"{matrix_path.stem}.{key[:16]}{matrix_path.suffix}")
+
+
+def _read_saved(matrix_path: Path, meta_path: Path):
+    """저장된 (키, 인덱스[memory-map], 행별 stamp) / 없거나 깨졌으면 None"""
+    try:
+        with np.load(meta_path) as z:
+            key = str(z["key"])
+            matrix_name = str(z["matrix"])
+            meta = z["meta"]
+            stamps = [tuple(int(v) for v in row) for row in z["stamps"]]
+        # 메타에 적힌 (같은 저장에서 쓴) 행렬만 사용
+        if matrix_name != _matrix_file(matrix_path, key).name:
+            return None
+        matrix = np.load(matrix_path.with_name(matrix_name), mmap_mode="r")
+    except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+        return None
+    if matrix.ndim != 2 or matrix.shape != (len(meta), FEATURE_DIM) or len(stamps) != len(meta):
+        return None
+    return key, IconIndex(matrix, meta), stamps
+
+
+def _save(index: IconIndex, stamps: List[Tuple[int, int]], key: str,
+          matrix_path: Path, meta_path: Path) -> None:
+    """
+    임시 파일로 쓴 뒤 교체 (키별 행렬 먼저, 행렬 이름이 든 메타는 마지막)
+    다른 키의 예전 행렬 파일은 정리 (다른 프로세스가 열고 있으면 남겨 둠)
+    """
+    tag = f".{os.getpid()}.tmp"
+    target = _matrix_file(matrix_path, key)
+    tmp_matrix = target.with_name(target.name + tag)
+    tmp_meta = meta_path.with_name(meta_path.name + tag)
+    with tmp_matrix.open("wb") as f:
+        np.save(f, np.asarray(index.matrix, dtype=np.float32))
+    with tmp_meta.open("wb") as f:
+        np.savez(f, key=np.array(key), matrix=np.array(target.name), meta=index.meta,
+                 stamps=np.array(stamps, dtype=np.int64).reshape(-1, 2))
+    tmp_matrix.replace(target)
+    tmp_meta.replace(meta_path)
+
+    for old in matrix_path.parent.glob(f"{matrix_path.stem}.*{matrix_path.suffix}"):
+        if old != target:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+# 프로세스 안 캐시: (키, 인덱스)
+_LOADED: Optional[Tuple[str, IconIndex]] = None
+
+
+def load_icon_index(manifest: ChartManifest,
+                    matrix_path: Path = MATRIX_PATH, meta_path: Path = META_PATH) -> IconIndex:
+    """
+    저장된 인덱스를 memory-map 으로 열어 반환
+    manifest 나 이미지가 바뀌었으면 바뀐 이미지만 다시 벡터화해서 저장 후 반환
+    (저장할 수 없는 환경이면 메모리에서만 사용)
+    """
+    global _LOADED
+    key = index_key(manifest)
+    if _LOADED is not None and _LOADED[0] == key:
+        return _LOADED[1]
+
+    saved = _read_saved(matrix_path, meta_path)
+    if saved is not None and saved[0] == key:
+        _LOADED = (key, saved[1])
+        return saved[1]
+
+    reuse = None
+    if saved is not None:
+        _, old, old_stamps = saved
+        reuse = {
+            (str(old.meta[i]["path"]), old_stamps[i]): np.array(old.matrix[i])
+            for i in range(len(old))
+        }
+    index, stamps = _build(manifest, reuse)
+
+    try:
+        _save(index, stamps, key, matrix_path, meta_path)
+    except OSError:
+        pass
+    _LOADED = (key, index)
+    return index
@@ -4,10 +4,17 @@
 # 예:
 #   python lib/ingest_youtube.py "https://youtube.com/playlist?list=PLexrkqgKCXvC5P6B5Zggyz44M6kAU10P1"
 
-import sys, re, json
+import sys, os, re, json
 from pathlib import Path
 from typing import Dict, Any, List
 
+try:
+    from lib import lexicon_db
+    from lib.utils import is_playlist_only, video_record
+except ImportError:  # python lib/ingest_*.py 로 실행한 경우
+    import lexicon_db
+    from utils import is_playlist_only, video_record
+
 BASE = Path(__file__).resolve().parent
 SYMBOLS_PATH = BASE / "symbols.json"          # 기존 사전
 EXTRA_PATH   = BASE / "symbols_extra.json"    # 새 항목 누적 저장
@@ -28,7 +35,7 @@ def _read_json_safely(path: Path) -> Dict[str, Any]:
 
 def _write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
     """임시 파일로 쓴 뒤 교체 (중간 실패 시 0바이트 방지)"""
-    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
     tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
     tmp.replace(path)
 
@@ -73,9 +80,8 @@ def _fetch_entries(urls: List[str]) -> List[Dict[str, Any]]:
                 if not url:
                     continue
 
-                # Shorts 등도 허용하되, "playlist 전용 링크(list=... 만 있고 watch?v= 없음)"는 제외
-                if "list=" in url and "watch?v=" not in url:
-                    # 개별 영상 링크만 요구사항에 맞게 수집
+                # Shorts 등도 허용하되, "playlist 전용 링크"는 제외 (개별 영상 링크만 수집)
+                if is_playlist_only(url):
                     continue
 
                 has_ko = bool(re.search(r"[가-힣]", title))
@@ -119,6 +125,7 @@ def main() -> None:
         sys.exit(0)
 
     added = 0
+    new_entries: Dict[str, Any] = {}
     for v in videos:
         title = v["title"]
         url   = v["url"]
@@ -143,10 +150,11 @@ def main() -> None:
             "desc_ko": "",               # 설명은 이후 앱에서 보강 가능
             "aliases": [title],
             "delta": 0,                  # 증감 정보 알 수 없으므로 0
-            "videos": [{"title": title, "url": url}],  # 요구사항: 개별 영상 1개
+            "videos": [video_record({"title": title, "url": url})],  # 요구사항: 개별 영상 1개 (ID/썸네일 미리 계산)
         }
 
         extra[key] = entry
+        new_entries[key] = entry
         # 중복 방지 인덱스에 반영
         known.add(tnorm)
         known.add(_normalize(key))
@@ -154,6 +162,8 @@ def main() -> None:
 
     # 원자적 저장
     _write_json_atomic(EXTRA_PATH, extra)
+    # lib/lexicon.db 를 쓰는 경우 새 항목만 반영
+    lexicon_db.upsert_if_enabled(new_entries)
 
     print(f"✅ 새로 추가된 항목: {added}개")
     print(f"📝 저장: {EXTRA_PATH}")
@@ -7,6 +7,13 @@
 import sys, os, re, json
 from pathlib import Path
 
+try:
+    from lib import lexicon_db
+    from lib.utils import is_playlist_only, video_record
+except ImportError:  # python lib/ingest_*.py 로 실행한 경우
+    import lexicon_db
+    from utils import is_playlist_only, video_record
+
 BASE = Path(__file__).resolve().parent
 SYMBOLS_PATH = BASE / "symbols.json"          
 EXTRA_PATH   = BASE / "symbols_extra.json"    
@@ -17,9 +24,12 @@ def load_json(p: Path) -> dict:
         return json.load(f)
 
 def save_json(p: Path, data: dict):
+    """임시 파일로 쓴 뒤 교체 (실행 중인 페이지가 반쯤 쓴 파일을 읽지 않도록)"""
     p.parent.mkdir(parents=True, exist_ok=True)
-    with p.open("w", encoding="utf-8") as f:
+    tmp = p.with_name(f"{p.name}.{os.getpid()}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+    tmp.replace(p)
 
 def normalize(s: str) -> str:
     return (s or "").strip().lower()
@@ -66,6 +76,8 @@ def fetch_videos(url):
         link = e.get("url") or ""
         if not link.startswith("http"):
             link = f"https://www.youtube.com/watch?v={link}"
+        if is_playlist_only(link):
+            continue
         videos.append({"title": title, "url": link})
     return videos
 
@@ -92,6 +104,7 @@ def main():
         return
 
     added = 0
+    new_entries = {}
     for v in videos:
         title = v["title"]
         link  = v["url"]
@@ -111,13 +124,15 @@ def main():
                 "desc_ko": "",
                 "aliases": [key, title],
                 "delta": 0,
-                "videos": [{"title": title, "url": link}]
+                "videos": [video_record({"title": title, "url": link})]
             }
             extra[key] = entry
+            new_entries[key] = entry
             known.add(normalize(key))
             added += 1
 
     save_json(EXTRA_PATH, extra)
+    lexicon_db.upsert_if_enabled(new_entries)
     print(f"✅ 새 약어 {added}개 추가 완료 → {EXTRA_PATH}")
 
 if __name__ == "__main__":
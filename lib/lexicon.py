@@ -0,0 +1,276 @@
+# lib/lexicon.py
+# 사전 원본(JSON)에서 페이지들이 쓰는 파생 데이터를 한 번에 만들어
+# 바이너리(pickle) 파일로 저장해 두는 모듈
+#
+# 사용법:
+#   python -m lib.lexicon          # 필요하면 다시 빌드 (원본이 그대로면 건너뜀)
+#   python -m lib.lexicon build    # 무조건 다시 빌드
+#
+# - 원본: symbols.json, symbols_extra.json, video_overrides.json, 차트 manifest.json
+# - 결과: lib/lexicon.pkl (병합 사전, 검색 인덱스, 변화량 표, 이름 목록, 대표 영상 …)
+#   차트 매니페스트 자체는 lib/chart_manifest.py 가 관리 (여기서는 이름 목록만)
+# - 페이지에서는 load_lexicon()만 부르면 됨
+#   원본 파일의 mtime/크기가 바뀌면 해시를 비교해 내용이 달라진 경우에만 다시 빌드
+
+import os
+import sys
+import json
+import pickle
+import hashlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from lib import parser
+from lib.chart_manifest import MANIFEST_PATH as CHART_MANIFEST_PATH, ManifestError, load_manifest
+from lib.utils import normalize_videos, pick_video_record
+
+# 파일 형식이 바뀌면 올려서 예전 파일을 무시하게 함
+ARTIFACT_VERSION = 6
+
+LIB_DIR = Path(__file__).resolve().parent
+ROOT = LIB_DIR.parent
+ARTIFACT_PATH = LIB_DIR / "lexicon.pkl"
+
+BASE_PATH = LIB_DIR / "symbols.json"
+EXTRA_PATH = LIB_DIR / "symbols_extra.json"
+OVERRIDES_PATH = LIB_DIR / "video_overrides.json"
+
+SOURCES: Dict[str, Path] = {
+    "base": BASE_PATH,
+    "extra": EXTRA_PATH,
+    "overrides": OVERRIDES_PATH,
+    "chart_manifest": CHART_MANIFEST_PATH,
+}
+
+# 원본별 (mtime_ns, 크기, sha1) — 파일이 없으면 None
+SourceStamp = Optional[Tuple[int, int, str]]
+
+
+class Lexicon:
+    """빌드 결과 묶음 (pickle로 통째 저장)"""
+
+    def __init__(self, sources: Dict[str, SourceStamp]):
+        self.version = ARTIFACT_VERSION
+        self.sources = sources
+        self.merged: Dict[str, Any] = {}            # base + extra (+ 영상 덮어쓰기)
+        self.extra_keys: frozenset = frozenset()    # symbols_extra.json 에서 온 키
+        self.terms: Optional[parser.TermIndex] = None
+        self.deltas: Optional[parser.DeltaTable] = None
+        self.videos: Dict[str, Dict[str, Any]] = {} # 키 -> 대표 영상 레코드 (영상 있는 키만)
+        self.symbol_names: List[str] = []           # 키/영문/한글/별칭 전체 (정렬)
+        self.chart_names: List[str] = []            # 차트 기호 이름 (정렬)
+
+
+# -----------------------------------------------------------------------------
+# 원본 파일 상태
+# -----------------------------------------------------------------------------
+def _sha1(path: Path) -> str:
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def _stat(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _stamp(path: Path) -> SourceStamp:
+    st = _stat(path)
+    if st is None:
+        return None
+    return st[0], st[1], _sha1(path)
+
+
+def _is_fresh(lex: Lexicon) -> Tuple[bool, bool]:
+    """
+    (내용이 같은가, stamp 갱신이 필요한가)
+    mtime/크기가 같으면 해시 계산 없이 통과, 다르면 해시로 실제 변경 여부 확인
+    """
+    if getattr(lex, "version", None) != ARTIFACT_VERSION or set(lex.sources) != set(SOURCES):
+        return False, False
+    touched = False
+    for name, path in SOURCES.items():
+        old = lex.sources[name]
+        st = _stat(path)
+        if old is None or st is None:
+            if old is not None or st is not None:
+                return False, False
+            continue
+        if (old[0], old[1]) == st:
+            continue
+        if old[2] != _sha1(path):
+            return False, False
+        touched = True
+    return True, touched
+
+
+# -----------------------------------------------------------------------------
+# 빌드
+# -----------------------------------------------------------------------------
+def _read_json(path: Path) -> Dict[str, Any]:
+    """파일이 없으면 {} / 깨진 JSON은 예외 그대로 (수집 스크립트가 쓰는 중일 수 있음)"""
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data if isinstance(data, dict) else {}
+
+
+def _symbol_names(merged: Dict[str, Any]) -> List[str]:
+    names = set()
+    for k, v in merged.items():
+        names.add(k)
+        names.add(v.get("name_en", ""))
+        names.add(v.get("name_ko", ""))
+        for a in v.get("aliases", []):
+            names.add(a)
+    return sorted({n.strip() for n in names if n and n.strip()})
+
+
+def build_lexicon() -> Lexicon:
+    """원본 JSON들을 읽어 Lexicon 생성 (저장은 하지 않음)"""
+    lex = Lexicon({name: _stamp(path) for name, path in SOURCES.items()})
+
+    merged = parser.load_merged_lib(
+        (str(BASE_PATH), str(EXTRA_PATH)), overrides=str(OVERRIDES_PATH)
+    )
+    # videos 를 video_id/watch_url/thumbnail_url/playlist_only 레코드로 (영상 덮어쓰기 반영 후)
+    # load_merged_lib 결과는 공유 캐시라 항목을 복사해서 바꿈
+    merged = {k: {**v, "videos": normalize_videos(v.get("videos", []))} for k, v in merged.items()}
+    extra = _read_json(EXTRA_PATH)
+
+    lex.merged = merged
+    lex.extra_keys = frozenset(extra)
+    lex.terms = parser.TermIndex(merged)
+    lex.deltas = parser.DeltaTable(merged)
+    picks = {k: pick_video_record(v["videos"]) for k, v in merged.items()}
+    lex.videos = {k: rec for k, rec in picks.items() if rec}
+    lex.symbol_names = _symbol_names(merged)
+    try:
+        lex.chart_names = load_manifest(CHART_MANIFEST_PATH).names()
+    except ManifestError:
+        lex.chart_names = []
+    return lex
+
+
+def save_lexicon(lex: Lexicon, path: Path = ARTIFACT_PATH) -> None:
+    """
+    임시 파일로 쓴 뒤 교체 (중간 실패 시 깨진 파일 방지)
+    임시 파일 이름에 pid → 여러 프로세스가 동시에 다시 빌드해도 서로의 파일을 섞어 쓰지 않음
+    """
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        pickle.dump(lex, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(path)
+
+
+def _read_artifact(path: Path) -> Optional[Lexicon]:
+    if not path.exists():
+        return None
+    try:
+        with path.open("rb") as f:
+            lex = pickle.load(f)
+    except Exception:
+        # 예전 형식이거나 깨진 파일 → 다시 빌드
+        return None
+    return lex if isinstance(lex, Lexicon) else None
+
+
+# -----------------------------------------------------------------------------
+# 저장소 (프로세스 안에서 모든 페이지가 공유)
+# -----------------------------------------------------------------------------
+class LexiconStore:
+    """
+    컴파일된 사전 + 버전 번호
+    - get(): 원본 파일 stat만 확인 (내용이 바뀐 경우에만 다시 빌드하고 version 증가)
+      → 수집 스크립트가 symbols_extra.json 을 고치면 다음 재실행에서 바로 반영
+    - derived(): 사전에서 만든 페이지별 캐시 (version이 바뀌면 자동으로 버림)
+    """
+
+    def __init__(self, path: Path = ARTIFACT_PATH):
+        self.path = path
+        self.version = 0
+        self._lex: Optional[Lexicon] = None
+        self._derived: Dict[str, Tuple[Lexicon, Any]] = {}   # 이름 -> (만들 때 쓴 사전, 값)
+
+    def get(self, force_rebuild: bool = False) -> Lexicon:
+        lex = None if force_rebuild else (self._lex or _read_artifact(self.path))
+        if lex is not None:
+            fresh, touched = _is_fresh(lex)
+            if fresh:
+                if touched:
+                    # 내용은 같고 mtime만 바뀜 → stamp만 갱신
+                    lex.sources = {name: _stamp(path) for name, path in SOURCES.items()}
+                    self._try_save(lex)
+                return self._set(lex)
+
+        try:
+            rebuilt = build_lexicon()
+        except json.JSONDecodeError:
+            # 쓰는 도중의 파일 → 이전 사전으로 버티고 다음 호출에서 다시 시도
+            if lex is None:
+                raise
+            return self._set(lex)
+        self._try_save(rebuilt)
+        return self._set(rebuilt)
+
+    def derived(self, name: str, factory: Callable[[Lexicon], Any]) -> Any:
+        """
+        현재 버전 사전에서 만든 값 (같은 사전이면 다시 만들지 않음)
+        값과 함께 만들 때 쓴 사전을 보관 → 다른 세션 스레드가 그 사이 다시 빌드해도
+        이전 사전으로 만든 값을 새 버전 값으로 돌려주지 않음
+        """
+        lex = self.get()
+        cached = self._derived.get(name)
+        if cached is None or cached[0] is not lex:
+            cached = self._derived[name] = (lex, factory(lex))
+        return cached[1]
+
+    def _set(self, lex: Lexicon) -> Lexicon:
+        if lex is not self._lex:
+            self._lex = lex
+            self.version += 1
+            self._derived.clear()
+        return lex
+
+    def _try_save(self, lex: Lexicon) -> None:
+        try:
+            save_lexicon(lex, self.path)
+        except OSError:
+            # 읽기 전용 배포 환경 등 → 메모리에만 유지
+            pass
+
+
+STORE = LexiconStore()
+
+
+def load_lexicon(force_rebuild: bool = False) -> Lexicon:
+    """
+    컴파일된 사전 반환 (STORE.get())
+    메모리 → 디스크(lexicon.pkl) → 원본 빌드 순으로 찾고, 원본이 바뀌었으면 다시 빌드
+    """
+    return STORE.get(force_rebuild)
+
+
+def lexicon_version() -> int:
+    """사전이 다시 빌드될 때마다 1씩 증가 (페이지 캐시 키로 사용)"""
+    STORE.get()
+    return STORE.version
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def main() -> None:
+    force = len(sys.argv) > 1 and sys.argv[1] == "build"
+    lex = load_lexicon(force_rebuild=force)
+    print(f"✅ 사전 {len(lex.merged)}개 항목, 차트 기호 이름 {len(lex.chart_names)}개")
+    print(f"📝 저장: {ARTIFACT_PATH}")
+
+
+if __name__ == "__main__":
+    # python -m 으로 실행하면 이 파일이 __main__ 이 되어 pickle 에 __main__.Lexicon 으로 기록됨
+    # → 페이지에서 읽을 수 있도록 lib.lexicon 모듈을 통해 실행
+    from lib.lexicon import main as _main
+    _main()
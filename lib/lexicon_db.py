@@ -0,0 +1,386 @@
+# lib/lexicon_db.py
+# 뜨개 약어 사전 SQLite 저장소 (선택 사항)
+#
+# 사용법:
+#   python lib/lexicon_db.py init     # symbols.json + symbols_extra.json 으로 lib/lexicon.db 생성/동기화
+#
+# - DB 파일이 있을 때만 사용 (없으면 페이지는 기존처럼 dict 검색)
+#   경로는 KNIT_LEXICON_DB 환경 변수로 바꿀 수 있음
+# - FTS5(trigram) 색인: 키/영문/한글/설명/별칭 부분 문자열 검색
+#   3글자 미만 검색어나 FTS5 가 없는 SQLite 에서는 LIKE 로 대신 검색
+# - 수집 스크립트(ingest_youtube*.py)는 추가한 항목만 upsert
+# - 페이지는 ensure_synced()로 컴파일된 사전(lib/lexicon.py)과 맞춤
+#   원본 JSON(symbols*.json, video_overrides.json) 해시가 DB에 기록된 것과 다르면 전체 동기화
+#
+# 이 파일은 수집 스크립트가 `python lib/...py` 로 실행될 때도 import 되므로
+# lib 패키지 모듈(utils)은 두 가지 방식 모두로 가져옴
+
+import os
+import sys
+import json
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from lib.utils import normalize_videos
+except ImportError:  # python lib/lexicon_db.py 로 실행한 경우
+    from utils import normalize_videos
+
+BASE = Path(__file__).resolve().parent
+DB_PATH = Path(os.environ.get("KNIT_LEXICON_DB", BASE / "lexicon.db"))
+SYMBOLS_PATH = BASE / "symbols.json"
+EXTRA_PATH = BASE / "symbols_extra.json"
+
+# 페이지들은 st.cache_resource 로 연결 하나를 여러 세션 스레드가 같이 씀
+# → 쓰기(동기화/upsert/meta)는 이 잠금으로 한 번에 하나씩 (sync 안에서 upsert 를 부르므로 RLock)
+_WRITE_LOCK = threading.RLock()
+
+# trigram 토크나이저는 3글자 이상부터 색인 검색 가능
+FTS_MIN_QUERY = 3
+
+# 검색 대상 필드 (FTS 열 순서와 같음)
+FIELDS = ("key", "name_en", "name_ko", "desc_ko", "aliases")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id        INTEGER PRIMARY KEY,
+    key       TEXT NOT NULL UNIQUE,
+    name_en   TEXT NOT NULL DEFAULT '',
+    name_ko   TEXT NOT NULL DEFAULT '',
+    desc_ko   TEXT NOT NULL DEFAULT '',
+    aliases   TEXT NOT NULL DEFAULT '',     -- 줄바꿈으로 이은 별칭 (검색용)
+    data      TEXT NOT NULL,                -- 항목 원본 JSON
+    is_extra  INTEGER NOT NULL DEFAULT 0,
+    has_video INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS labels (
+    label TEXT NOT NULL,                    -- 소문자 키/별칭/이름
+    key   TEXT NOT NULL,
+    text  TEXT NOT NULL DEFAULT '',         -- 원래 표기 (키 > 이름 > 별칭 중 처음 나온 것)
+    PRIMARY KEY (label, key)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    key, name_en, name_ko, desc_ko, aliases,
+    content='entries', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, key, name_en, name_ko, desc_ko, aliases)
+    VALUES (new.id, new.key, new.name_en, new.name_ko, new.desc_ko, new.aliases);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, key, name_en, name_ko, desc_ko, aliases)
+    VALUES ('delete', old.id, old.key, old.name_en, old.name_ko, old.desc_ko, old.aliases);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, key, name_en, name_ko, desc_ko, aliases)
+    VALUES ('delete', old.id, old.key, old.name_en, old.name_ko, old.desc_ko, old.aliases);
+    INSERT INTO entries_fts(rowid, key, name_en, name_ko, desc_ko, aliases)
+    VALUES (new.id, new.key, new.name_en, new.name_ko, new.desc_ko, new.aliases);
+END;
+"""
+
+
+def is_enabled(path: Path = DB_PATH) -> bool:
+    """DB 파일이 만들어져 있으면 사용"""
+    return path.exists()
+
+
+def connect(path: Path = DB_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    conn.executescript(_SCHEMA)
+    _migrate(conn)
+    try:
+        conn.executescript(_FTS_SCHEMA)
+    except sqlite3.OperationalError:
+        # FTS5 / trigram 미지원 SQLite → LIKE 검색만 사용
+        pass
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """예전 DB에 labels.text 열 추가 → 다음 ensure_synced 때 전체 동기화로 채움"""
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(labels)")}
+    if "text" not in cols:
+        with _WRITE_LOCK, conn:
+            conn.execute("ALTER TABLE labels ADD COLUMN text TEXT NOT NULL DEFAULT ''")
+            conn.execute("DELETE FROM meta WHERE name = 'sources'")
+
+
+def has_fts(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entries_fts'"
+    ).fetchone()
+    return row is not None
+
+
+# -----------------------------------------------------------------------------
+# 쓰기
+# -----------------------------------------------------------------------------
+def _labels(key: str, item: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """[(소문자 라벨, 원래 표기), ...] 같은 소문자 라벨은 키 > 이름 > 별칭 순으로 처음 것"""
+    names = [key, item.get("name_en") or "", item.get("name_ko") or ""]
+    names += [a or "" for a in item.get("aliases", [])]
+    out: Dict[str, str] = {}
+    for n in names:
+        n = n.strip()
+        if n:
+            out.setdefault(n.lower(), n)
+    return sorted(out.items())
+
+
+def _has_video(item: Dict[str, Any]) -> bool:
+    return any(not v["playlist_only"] for v in normalize_videos(item.get("videos", [])))
+
+
+def upsert(conn: sqlite3.Connection, entries: Dict[str, Dict[str, Any]], is_extra: bool = True) -> int:
+    """항목 추가/갱신 (키 기준), 반영한 개수 반환"""
+    n = 0
+    with _WRITE_LOCK, conn:
+        for key, item in entries.items():
+            aliases = "\n".join(a for a in item.get("aliases", []) if a)
+            conn.execute(
+                """
+                INSERT INTO entries (key, name_en, name_ko, desc_ko, aliases, data, is_extra, has_video)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    name_en = excluded.name_en, name_ko = excluded.name_ko,
+                    desc_ko = excluded.desc_ko, aliases = excluded.aliases,
+                    data = excluded.data, is_extra = excluded.is_extra,
+                    has_video = excluded.has_video
+                """,
+                (
+                    key,
+                    item.get("name_en") or "",
+                    item.get("name_ko") or "",
+                    item.get("desc_ko") or "",
+                    aliases,
+                    json.dumps(item, ensure_ascii=False),
+                    int(is_extra),
+                    int(_has_video(item)),
+                ),
+            )
+            conn.execute("DELETE FROM labels WHERE key = ?", (key,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO labels (label, key, text) VALUES (?, ?, ?)",
+                [(label, key, text) for label, text in _labels(key, item)],
+            )
+            n += 1
+    return n
+
+
+def sync(conn: sqlite3.Connection, merged: Dict[str, Dict[str, Any]], extra_keys: Iterable[str]) -> int:
+    """병합 사전과 똑같이 맞춤 (사전에 없는 키는 삭제)"""
+    extra_keys = set(extra_keys)
+    n = 0
+    with _WRITE_LOCK:
+        with conn:
+            existing = {k for (k,) in conn.execute("SELECT key FROM entries")}
+            gone = existing - set(merged)
+            conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in gone])
+            conn.executemany("DELETE FROM labels WHERE key = ?", [(k,) for k in gone])
+        for is_extra in (False, True):
+            part = {k: v for k, v in merged.items() if (k in extra_keys) == is_extra}
+            n += upsert(conn, part, is_extra=is_extra)
+    return n
+
+
+# -----------------------------------------------------------------------------
+# 읽기
+# -----------------------------------------------------------------------------
+def _like_escape(q: str) -> str:
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# SearchIndex 와 같은 순위 단계 (? 4개 모두 소문자 검색어)
+# SQLite lower()는 ASCII 만 바꾸지만 한글에는 대소문자가 없으므로 dict 검색과 결과가 같음
+_RANK_SQL = """CASE
+    WHEN lower(e.key) = ? THEN 0
+    WHEN EXISTS (SELECT 1 FROM labels l WHERE l.key = e.key AND l.label = ?) THEN 1
+    WHEN instr(lower(e.key), ?) > 0 THEN 2
+    WHEN instr(lower(e.name_en) || char(10) || lower(e.name_ko) || char(10) || lower(e.aliases), ?) > 0 THEN 3
+    ELSE 4 END"""
+
+
+def search(
+    conn: sqlite3.Connection,
+    q: str,
+    only_extra: bool = False,
+    only_video: bool = False,
+    limit: Optional[int] = None,
+) -> List[str]:
+    """
+    부분 문자열 검색 → 키 목록
+    순위는 dict 검색(SearchIndex)과 같은 단계:
+    키 일치 > 별칭/이름 일치 > 키 포함 > 별칭/이름 포함 > 설명 포함
+    설명에만 있는 항목은 FTS 사용 시 bm25 순위, LIKE 대체 검색은 등록 순
+    """
+    q = q.strip()
+    where: List[str] = []
+    params: List[Any] = []
+    if only_extra:
+        where.append("e.is_extra = 1")
+    if only_video:
+        where.append("e.has_video = 1")
+
+    if not q:
+        src = "entries e"
+        order = "e.id"
+    elif len(q) >= FTS_MIN_QUERY and has_fts(conn):
+        src = "entries_fts f JOIN entries e ON e.id = f.rowid"
+        where.insert(0, "entries_fts MATCH ?")
+        params.insert(0, '"' + q.replace('"', '""') + '"')
+        order = "bm25(entries_fts)"
+    else:
+        src = "entries e"
+        pat = f"%{_like_escape(q)}%"
+        where.insert(0, "(" + " OR ".join(f"e.{f} LIKE ? ESCAPE '\\'" for f in FIELDS) + ")")
+        params[:0] = [pat] * len(FIELDS)
+        order = "e.id"
+
+    if q:
+        # 일치/포함 단계는 dict 검색처럼 등록 순, 설명에만 있는 항목은 bm25(또는 등록 순)
+        sql = f"SELECT e.key, {_RANK_SQL} AS tier FROM {src}"
+        params[:0] = [q.lower()] * 4
+        order = f"tier, CASE WHEN tier < 4 THEN e.id END, {order}"
+    else:
+        sql = f"SELECT e.key, 0 FROM {src}"
+
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY " + order
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return [k for k, _ in conn.execute(sql, params)]
+
+
+def get_entries(conn: sqlite3.Connection, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+    """키 순서를 유지한 항목 dict"""
+    out: Dict[str, Dict[str, Any]] = {}
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        rows = conn.execute(
+            f"SELECT key, data FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+        )
+        found = {k: json.loads(d) for k, d in rows}
+        out.update((k, found[k]) for k in chunk if k in found)
+    return out
+
+
+def find_labels(conn: sqlite3.Connection, text: str) -> List[Tuple[str, str]]:
+    """
+    문장 안에 (부분 문자열로) 들어 있는 키/별칭/이름 찾기 → [(원래 표기 label, key), ...]
+    dict 검색과 같은 기준 ("겉뜨기로", "yo." 안의 용어도 찾음)
+    항목 등록 순, 같은 항목 안에서는 긴 라벨 먼저
+    """
+    t = text.lower()
+    if not t.strip():
+        return []
+    return conn.execute(
+        """
+        SELECT CASE WHEN l.text != '' THEN l.text ELSE l.label END, l.key FROM labels l JOIN entries e ON e.key = l.key
+        WHERE instr(?, l.label) > 0
+        ORDER BY e.id, length(l.label) DESC
+        """,
+        (t,),
+    ).fetchall()
+
+
+# -----------------------------------------------------------------------------
+# 컴파일된 사전과 동기화
+# -----------------------------------------------------------------------------
+def source_digest(sources: Dict[str, Any]) -> str:
+    """원본 파일별 (mtime, 크기, sha1) → 내용 해시만으로 만든 키 (mtime 만 바뀐 경우는 같은 값)"""
+    parts = {name: (stamp[2] if stamp else None) for name, stamp in sources.items()}
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _get_meta(conn: sqlite3.Connection, name: str) -> Optional[str]:
+    row = conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_meta(conn: sqlite3.Connection, name: str, value: Optional[str]) -> None:
+    with _WRITE_LOCK, conn:
+        if value is None:
+            conn.execute("DELETE FROM meta WHERE name = ?", (name,))
+        else:
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+
+
+def ensure_synced(conn: sqlite3.Connection, lex: Any) -> bool:
+    """
+    컴파일된 사전(lib.lexicon.Lexicon)과 DB를 맞춤
+    원본 해시가 DB에 기록된 것과 같으면 아무것도 안 함 (재실행마다 조회 한 번)
+    return: 동기화했으면 True
+    """
+    digest = source_digest(lex.sources)
+    if _get_meta(conn, "sources") == digest:
+        return False
+    with _WRITE_LOCK:
+        # 잠금을 기다리는 동안 다른 세션이 이미 맞췄을 수 있음
+        if _get_meta(conn, "sources") == digest:
+            return False
+        sync(conn, lex.merged, lex.extra_keys)
+        _set_meta(conn, "sources", digest)
+    return True
+
+
+# -----------------------------------------------------------------------------
+# 수집 스크립트용
+# -----------------------------------------------------------------------------
+def upsert_if_enabled(entries: Dict[str, Dict[str, Any]], is_extra: bool = True) -> None:
+    """DB가 있으면 새 항목만 반영 (없으면 아무것도 안 함)"""
+    if not entries or not is_enabled():
+        return
+    conn = connect()
+    try:
+        n = upsert(conn, entries, is_extra=is_extra)
+    finally:
+        conn.close()
+    print(f"🗃️ DB 반영: {n}개 → {DB_PATH}")
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    """파일이 없으면 {} / 깨진 JSON은 예외 그대로 (빈 사전으로 동기화하면 DB 항목이 지워짐)"""
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data if isinstance(data, dict) else {}
+
+
+def main() -> None:
+    if len(sys.argv) < 2 or sys.argv[1] != "init":
+        print("사용법: python lib/lexicon_db.py init")
+        sys.exit(1)
+
+    try:
+        base = _read_json(SYMBOLS_PATH)
+        extra = _read_json(EXTRA_PATH)
+    except json.JSONDecodeError as e:
+        # 수집 스크립트가 쓰는 중일 수 있음 → DB는 그대로 두고 중단
+        print(f"❌ JSON을 읽을 수 없어 동기화하지 않았습니다: {e}")
+        sys.exit(1)
+    conn = connect()
+    try:
+        n = sync(conn, {**base, **extra}, extra.keys())
+        # video_overrides.json 은 반영하지 않았으므로 페이지에서 사전 기준으로 다시 맞추도록 표시 제거
+        _set_meta(conn, "sources", None)
+        fts = has_fts(conn)
+    finally:
+        conn.close()
+    print(f"✅ {n}개 항목 동기화 (FTS5: {'사용' if fts else '미지원 → LIKE 검색'})")
+    print(f"📝 저장: {DB_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,171 +3,983 @@
 
 import re
 import json
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Dict, Any, Optional
+from functools import lru_cache
+from itertools import chain, repeat
+from typing import List, Tuple, Dict, Any, Optional, Iterable, Iterator, Union, NamedTuple
 
+import numpy as np
 from rapidfuzz import process, fuzz
 
-# 전역 캐시
+from lib.term_index import DeletionIndex, NgramIndex, decompose_hangul, has_hangul
+
+# 전역 캐시 (마지막으로 load_lib 한 사전 = find_term 대상)
 _LIB: Optional[Dict[str, Any]] = None
-_ALL_KEYS: Optional[List[str]] = None
+_ALL_KEYS: Optional[List[str]] = None           # 퍼지 검색 후보 (키 + 별칭, 중복 없음)
+_ALIAS_INDEX: Optional[Dict[str, str]] = None   # 키/별칭 -> 표준키
+_TERM_INDEX: Optional["TermIndex"] = None       # 단계별 검색 인덱스 (정확/접두어/...)
 _LIB_PATH: Optional[Path] = None
 
+# 기본 사전 파일 (뒤 파일이 앞 파일을 덮어씀) / 영상 링크 덮어쓰기 파일
+LEXICON_FILES: Tuple[str, ...] = ("symbols.json", "symbols_extra.json")
+VIDEO_OVERRIDES_FILE = "video_overrides.json"
+
 def _resolve_path(p: str) -> Path:
     # 현재 파일 위치 기준 상대경로 -> 절대경로
     base = Path(__file__).resolve().parent
     return (base / p).resolve()
 
+def _build_alias_index(lib: Dict[str, Any]) -> Tuple[List[str], Dict[str, str]]:
+    """
+    (퍼지 후보 리스트, 키/별칭 -> 표준키) 한 번에 구성
+    같은 별칭이 여러 항목에 있으면 표준키 > 먼저 나온 항목 순으로 우선
+    """
+    index: Dict[str, str] = {k: k for k in lib}
+    for k, v in lib.items():
+        for a in v.get("aliases", []):
+            index.setdefault(a, k)
+    # dict는 삽입 순서를 유지 → 키 먼저, 별칭은 처음 나온 순서대로
+    return list(index), index
+
+# 접두어 검색을 시작할 최소 글자 수 (1글자는 후보가 너무 많음)
+PREFIX_MIN_LEN = 2
+# 퍼지 점수를 매길 n-gram 후보 수
+NGRAM_CANDIDATES = 20
+
+class TermIndex:
+    """
+    load_lib 시 사전마다 한 번 만드는 검색 인덱스
+    - choices / alias_index: 퍼지 후보, 키/별칭 -> 표준키
+    - exact: 소문자(casefold) 키/별칭/영문·한글 이름 -> 표준키
+    - trie : exact 용어의 접두어 트리, 노드마다 그 아래 용어의 표준키 -> 가장 짧은 용어 (최대 2개)
+    - typos: 짧은 키/별칭의 삭제 이웃 인덱스 (편집 거리 2 이내 오타 교정)
+    - ngram: 키/별칭/영문·한글 이름의 자모 n-gram 역색인 (퍼지 점수 전 후보 추리기)
+    """
+
+    def __init__(self, lib: Dict[str, Any]):
+        self.choices, self.alias_index = _build_alias_index(lib)
+
+        names = [
+            (v.get(f) or "", k) for k, v in lib.items() for f in ("name_en", "name_ko")
+        ]
+
+        # 키/별칭이 이름보다 우선 ("Knit" → k)
+        self.exact: Dict[str, str] = {}
+        for term, key in chain(self.alias_index.items(), names):
+            term = term.strip().casefold()
+            if term:
+                self.exact.setdefault(term, key)
+
+        self.trie: Dict[Any, Any] = {}
+        for term, key in self.exact.items():
+            node = self.trie
+            for ch in term:
+                node = node.setdefault(ch, {})
+                keys = node.setdefault(None, {})
+                if key in keys:
+                    if len(term) < len(keys[key]):
+                        keys[key] = term
+                elif len(keys) < 2:     # 두 개면 '모호함'을 판단하기에 충분
+                    keys[key] = term
+
+        self.typos = DeletionIndex(self.alias_index.items())
+        self.ngram = NgramIndex(list(self.alias_index.items()) + names)
+
+    def prefix(self, q: str) -> Optional[Tuple[str, str]]:
+        """
+        'q ...'로 시작하는 용어(단어 경계, 'purl t' → 'purl tbl')가 한 항목에만 있으면
+        (표준키, 가장 짧은 용어) / 여러 항목이거나 단어 중간 접두어뿐이면 None
+        ('back' → 'backward ...' 처럼 단어 중간에서 끊긴 접두어는 퍼지 점수에 맡김)
+        """
+        if len(q) < PREFIX_MIN_LEN:
+            return None
+        node = self.trie
+        for ch in q.rstrip() + " ":
+            node = node.get(ch)
+            if node is None:
+                return None
+        keys = node[None]
+        if len(keys) != 1:
+            return None
+        return next(iter(keys.items()))
+
+# ------------------------------------------------------------
+# 파일별 JSON 캐시 (경로마다 따로 보관, mtime/크기가 바뀌었을 때만 다시 읽음)
+# ------------------------------------------------------------
+Stamp = Tuple[int, int]     # (mtime_ns, size)
+
+class _CachedJson:
+    __slots__ = ("stamp", "data", "index")
+
+    def __init__(self, stamp: Stamp, data: Dict[str, Any]):
+        self.stamp = stamp
+        self.data = data
+        self.index: Optional[TermIndex] = None   # load_lib 시 채움
+
+_JSON_CACHE: Dict[Path, _CachedJson] = {}
+_MERGED_CACHE: Dict[Tuple[Any, ...], Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+
+def _stamp(p: Path) -> Optional[Stamp]:
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _load_json_cached(p: Path) -> Optional[_CachedJson]:
+    """파일이 없으면 None / 바뀌지 않았으면 메모리 캐시 그대로"""
+    stamp = _stamp(p)
+    if stamp is None:
+        return None
+    cached = _JSON_CACHE.get(p)
+    if cached is not None and cached.stamp == stamp:
+        return cached
+    try:
+        data = json.loads(p.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        # 수집 스크립트가 쓰는 중일 수 있음 → 이전에 읽은 내용 유지
+        if cached is not None:
+            return cached
+        raise
+    entry = _JSON_CACHE[p] = _CachedJson(stamp, data)
+    return entry
+
 def load_lib(path: str) -> Dict[str, Any]:
     """
-    symbols.json 로드 (최초 1회 캐싱)
+    symbols.json 로드 (경로별 캐싱, 파일이 바뀌면 자동으로 다시 읽음)
     path: 'lib/symbols.json'처럼 상대경로로 넘겨도 됨
+    마지막으로 로드한 사전이 find_term 검색 대상이 됨
     """
-    global _LIB, _ALL_KEYS, _LIB_PATH
-    if _LIB is not None and _LIB_PATH is not None and _LIB_PATH == _resolve_path(path):
-        return _LIB
+    global _LIB, _ALL_KEYS, _ALIAS_INDEX, _TERM_INDEX, _LIB_PATH
 
     lib_path = _resolve_path(path)
-    if not lib_path.exists():
+    entry = _load_json_cached(lib_path)
+    if entry is None:
         raise FileNotFoundError(f"symbols.json을 찾을 수 없습니다: {lib_path}")
 
-    _LIB = json.loads(lib_path.read_text(encoding="utf-8"))
-    _ALL_KEYS = list(_LIB.keys())
-    # alias까지 포함해 퍼지 검색 품질 향상
-    for v in _LIB.values():
-        for a in v.get("aliases", []):
-            if a not in _ALL_KEYS:
-                _ALL_KEYS.append(a)
+    if entry.index is None:
+        # alias까지 포함해 퍼지 검색 품질 향상
+        entry.index = TermIndex(entry.data)
+    _LIB = entry.data
+    _TERM_INDEX = entry.index
+    _ALL_KEYS, _ALIAS_INDEX = _TERM_INDEX.choices, _TERM_INDEX.alias_index
     _LIB_PATH = lib_path
     return _LIB
 
+def load_merged_lib(paths: Tuple[str, ...] = LEXICON_FILES,
+                    overrides: Optional[str] = VIDEO_OVERRIDES_FILE) -> Dict[str, Any]:
+    """
+    기본 사전 + 추가 사전 (+ video_overrides.json) 병합본
+    원본 파일들이 그대로면 이전에 만든 dict를 그대로 돌려줌 (수정 금지)
+    video_overrides.json: {"키": "영상 URL"} → 해당 항목의 첫 번째 영상으로 사용
+    """
+    entries = [_load_json_cached(_resolve_path(p)) for p in paths]
+    ov = _load_json_cached(_resolve_path(overrides)) if overrides else None
+    stamp = tuple(e.stamp if e else None for e in entries) + (ov.stamp if ov else None,)
+
+    cache_key = (paths, overrides)
+    hit = _MERGED_CACHE.get(cache_key)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+
+    merged: Dict[str, Any] = {}
+    for e in entries:
+        if e is not None:
+            merged.update(e.data)
+
+    if ov is not None:
+        for key, url in ov.data.items():
+            if key not in merged or not url:
+                continue
+            item = dict(merged[key])
+            rest = [v for v in item.get("videos", []) if (v.get("url") or "").strip() != url]
+            item["videos"] = [{"title": item.get("name_en") or key, "url": url}] + rest
+            merged[key] = item
+
+    _MERGED_CACHE[cache_key] = (stamp, merged)
+    return merged
+
+class TermMatch(NamedTuple):
+    key: str                # 표준키 ("" = 못 찾음)
+    entry: Dict[str, Any]
+    tier: str               # exact / prefix / typo / ngram / fuzzy / none
+    score: float            # 0~100 (exact는 100)
+    elapsed: float          # 초
+
+# 단계별 응답 횟수/누적 시간: {"exact": [횟수, 초], ...}
+_TIER_STATS: Dict[str, List[float]] = {}
+
+def _record(key: str, tier: str, score: float, t0: float) -> TermMatch:
+    elapsed = time.perf_counter() - t0
+    stat = _TIER_STATS.setdefault(tier, [0, 0.0])
+    stat[0] += 1
+    stat[1] += elapsed
+    return TermMatch(key, _LIB[key] if key else {}, tier, score, elapsed)
+
+def resolve_term(q: str) -> TermMatch:
+    """
+    단계별 용어 검색: 정확 일치(대소문자 무시) → 접두어 → 약어 오타 → n-gram 후보 퍼지 → 전체 퍼지
+    앞 단계에서 찾으면 뒤 단계(퍼지 전체 스캔)는 건너뜀
+    """
+    t0 = time.perf_counter()
+    if not q or not q.strip():
+        return TermMatch("", {}, "none", 0.0, 0.0)
+    if _LIB is None or _TERM_INDEX is None:
+        raise RuntimeError("라이브러리가 아직 로드되지 않았습니다. load_lib() 먼저 호출하세요.")
+
+    idx = _TERM_INDEX
+    cf = q.strip().casefold()
+
+    key = idx.exact.get(cf)
+    if key is not None:
+        return _record(key, "exact", 100.0, t0)
+
+    hit = idx.prefix(cf)
+    if hit is not None:
+        key, term = hit
+        return _record(key, "prefix", float(fuzz.ratio(cf, term)), t0)
+
+    # 짧은 약어 오타 (ssl → ssk, k2tgo → k2tog), 3글자 미만 검색어는 건너뜀
+    typos = idx.typos.lookup(cf)
+    if typos:
+        term, key, dist = typos[0]
+        return _record(key, "typo", float(fuzz.ratio(cf, term)), t0)
+
+    # n-gram 후보가 있으면 후보에만 퍼지 점수 (한글은 자모 단위로 비교해 오타에 강하게)
+    cands = idx.ngram.search(q, limit=NGRAM_CANDIDATES)
+    if cands:
+        if has_hangul(q):
+            qj = decompose_hangul(q)
+            score, key = max(((fuzz.ratio(qj, decompose_hangul(t)), k) for t, k, _ in cands),
+                             key=lambda x: x[0])
+        else:
+            res = process.extractOne(q, [t for t, _, _ in cands], scorer=fuzz.token_set_ratio)
+            score, key = res[1], cands[res[2]][1]
+        return _record(key, "ngram", float(score), t0)
+
+    res = process.extractOne(q, idx.choices, scorer=fuzz.token_set_ratio)
+    if res:
+        # 키/별칭 -> 표준키 (사전 조회 한 번)
+        key = idx.alias_index.get(res[0])
+        if key is not None:
+            return _record(key, "fuzzy", float(res[1]), t0)
+    return _record("", "none", 0.0, t0)
+
+def resolver_stats() -> Dict[str, Dict[str, float]]:
+    """단계별 응답 횟수와 평균 소요 시간(ms)"""
+    return {
+        tier: {"count": int(n), "avg_ms": (sec / n * 1000.0) if n else 0.0}
+        for tier, (n, sec) in _TIER_STATS.items()
+    }
+
 def find_term(q: str) -> Tuple[str, Dict[str, Any]]:
     """
-    약어/동의어/오타(1~2자)까지 퍼지 매칭
+    약어/동의어/오타(1~2자)까지 매칭 (resolve_term의 간단 버전)
     return: (표준키, 항목dict) / 없으면 ("", {})
     """
-    global _LIB, _ALL_KEYS
-    if not q or not q.strip():
-        return "", {}
-    if _LIB is None or _ALL_KEYS is None:
+    m = resolve_term(q)
+    return m.key, m.entry
+
+def find_terms(queries: List[str], score_cutoff: float = 0) -> List[Tuple[str, float]]:
+    """
+    여러 검색어를 한 번에 퍼지 매칭 (rapidfuzz cdist, 모든 코어 사용)
+    return: 검색어 순서대로 [(표준키, 점수), ...] / 못 찾으면 ("", 0.0)
+    score_cutoff: 이 점수(0~100) 미만이면 못 찾은 것으로 처리
+    """
+    if _LIB is None or _ALL_KEYS is None or _ALIAS_INDEX is None:
         raise RuntimeError("라이브러리가 아직 로드되지 않았습니다. load_lib() 먼저 호출하세요.")
 
-    res = process.extractOne(q, _ALL_KEYS, scorer=fuzz.token_set_ratio)
-    if not res:
-        return "", {}
-    match = res[0]
-
-    # 표준 키로 바로 존재
-    if match in _LIB:
-        return match, _LIB[match]
-    # alias -> 표준키 역매핑
-    for k, v in _LIB.items():
-        if match in v.get("aliases", []):
-            return k, v
-    return "", {}
-
-# *...* n회 / [...] x n / k3 / p2 / 단일 토큰 / , ;
-# 회, times, x, X, ×(유니코드) 모두 허용
-TOKEN_RE = re.compile(r"""
-    \*\s*(.*?)\s*\*\s*(\d+)\s*(?:회|times|[xX×])   |   # * ... * n회
-    \[\s*(.*?)\s*\]\s*(\d+)\s*(?:회|times|[xX×])   |   # [ ... ] n회
-    \b(k|p)\s*(\d+)\b                              |   # k3, p2
-    \b(k2tog|p2tog|ssk|ssp|yo|m1L|m1R|k|p)\b       |   # 단일 토큰
-    [,;]                                           |   # 구분자
-""", re.VERBOSE | re.IGNORECASE)
+    # 같은 검색어는 한 번만 계산
+    uniq = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+    found: Dict[str, Tuple[str, float]] = {}
+    if uniq and _ALL_KEYS:
+        scores = process.cdist(uniq, _ALL_KEYS, scorer=fuzz.token_set_ratio,
+                               score_cutoff=score_cutoff or None, workers=-1)
+        best = scores.argmax(axis=1)
+        for q, col, row in zip(uniq, best, scores):
+            score = float(row[col])
+            if score > 0 and score >= score_cutoff:
+                found[q] = (_ALIAS_INDEX[_ALL_KEYS[col]], score)
 
-def expand_sequence(s: str) -> List[str]:
+    return [found.get(q.strip(), ("", 0.0)) if q else ("", 0.0) for q in queries]
+
+# ------------------------------------------------------------
+# 렉서 (한 번의 스캔으로 토큰 + 원문 위치)
+#   *...* n회 / [...] x n / (...) n번 반복 / k3 / p2 / 단일 토큰 / , ;
+#   회, 번, times, x, X, ×(유니코드) 모두 허용
+# ------------------------------------------------------------
+_LEX_BODY = r"""
+    (?P<ws>\s+)                                                         |
+    (?P<open>[\[(])                                                     |
+    (?P<close>[\])])(?:\s*(?:을|를))?                                    |   # ']을 3회 반복'의 조사까지
+    (?P<star>\*)                                                        |
+    (?P<sep>[,;.:])                                                     |
+    (?:[x×]|times)\s*(?P<mul>\d+)(?:\s*(?:회|번))?(?P<mul_rep>\s*반복)?(?!\w)       |   # x 6, ×6
+    (?P<rep>\d+)\s*(?:회|번|times|[x×])(?P<rep_rep>\s*반복)?(?!\w)         |   # 6회, 6x, 3번 반복
+    (?P<kn>[kp])\s*(?P<kn_n>\d+)(?!\w)                                   |   # k3, p2
+    (?P<word>[^\s,;.:\[\]()*×]+)                                         # 단일 토큰(k2tog, m1L, ...)
+"""
+LEX_RE = re.compile(_LEX_BODY, re.VERBOSE | re.IGNORECASE)
+
+# 한 단어로 잘리지 않는 용어("yarn over", "k tbl", "st.")를 찾기 위한 문자
+_PHRASE_CHARS = re.compile(r"[\s,;.:\[\]()*×]")
+
+# ------------------------------------------------------------
+# 코 수 변화량 표 (symbols.json / symbols_extra.json 의 delta 필드)
+#   - 키/영문·한글 이름/별칭을 소문자로 모아 dict 한 번 조회로 변화량 결정
+#     우선순위: 표준키 > 이름 > 별칭
+#     여러 항목이 같이 쓰는 이름은 변화량이 모두 같을 때만, 별칭은 한 항목만 쓸 때만 사용
+#     (예: k3tog/sk2p/s2kp 공통 별칭 '모아뜨기' 는 -2 로 세지 않음 → 'Tog' 의 한글 이름 -1)
+#   - 여러 단어짜리 용어는 렉서 정규식에 합쳐 넣어 같은 스캔에서 한 토큰으로 인식
+#     (긴 용어 우선 → sp2tog 안의 p2tog, yo. 안의 yo 같은 중복 집계 없음)
+# ------------------------------------------------------------
+class DeltaTable:
+    def __init__(self, lib: Dict[str, Any]):
+        self.deltas: Dict[str, int] = {}
+        names: Dict[str, set] = {}          # 이름 -> 변화량 집합
+        aliases: Dict[str, Dict[str, int]] = {}   # 별칭 -> {표준키: 변화량}
+        for k, v in lib.items():
+            d = int(v.get("delta", 0) or 0)
+            self.deltas[k.lower()] = d            # 표준키 우선 (뒤에 온 파일이 덮어씀)
+            for f in ("name_en", "name_ko"):
+                n = (v.get(f) or "").strip().lower()
+                if n:
+                    names.setdefault(n, set()).add(d)
+            for a in v.get("aliases", []):
+                a = (a or "").strip().lower()
+                if a:
+                    aliases.setdefault(a, {})[k] = d
+        for n, ds in names.items():
+            self.deltas.setdefault(n, ds.pop() if len(ds) == 1 else 0)
+        for a, owners in aliases.items():
+            if len(owners) == 1:
+                self.deltas.setdefault(a, next(iter(owners.values())))
+
+        phrases = sorted((t for t in self.deltas if _PHRASE_CHARS.search(t)), key=len, reverse=True)
+        if phrases:
+            alts = "|".join(re.escape(t) for t in phrases)
+            self.lex_re = re.compile(r"(?P<phrase>(?<!\w)(?:" + alts + r")(?!\w))|" + _LEX_BODY,
+                                     re.VERBOSE | re.IGNORECASE)
+        else:
+            self.lex_re = LEX_RE
+
+    def delta(self, tok: str) -> int:
+        return self.deltas.get(tok.lower(), 0) if tok else 0
+
+def load_delta_table(paths: Tuple[str, ...] = LEXICON_FILES) -> DeltaTable:
     """
-    서술형 문자열을 토큰 리스트로 전개
-    예) "[(p, k) x 6, m1L] x 8" -> ["p","k","p","k",...,"m1l", ...] (소문자 표준화)
+    여러 사전 파일을 병합해 변화량 표 생성 (뒤 파일이 앞 파일을 덮어씀)
+    페이지 5 코 수 계산과 parser의 계산이 같은 표를 쓰도록 하는 기본 진입점
     """
+    return _as_table(load_merged_lib(paths, overrides=None))
+
+# lib dict -> 파생 인덱스 (id 기준, dict도 함께 붙잡아 두어 id 재사용 방지) — 재계산 방지
+_DERIVED_CACHE: Dict[Tuple[str, int], Tuple[Dict[str, Any], Any]] = {}
+_DERIVED_CACHE_SIZE = 16
+
+def _derived(kind: str, lib: Dict[str, Any], factory):
+    hit = _DERIVED_CACHE.get((kind, id(lib)))
+    if hit is not None and hit[0] is lib:
+        return hit[1]
+    if len(_DERIVED_CACHE) >= _DERIVED_CACHE_SIZE:
+        _DERIVED_CACHE.clear()
+    value = factory(lib)
+    _DERIVED_CACHE[(kind, id(lib))] = (lib, value)
+    return value
+
+def _as_table(lib: Union[Dict[str, Any], DeltaTable]) -> DeltaTable:
+    if isinstance(lib, DeltaTable):
+        return lib
+    return _derived("delta", lib, DeltaTable)
+
+def term_index(lib: Dict[str, Any]) -> "TermIndex":
+    """임의의 사전 dict(예: load_merged_lib 결과)에 대한 검색 인덱스 (dict별 1회 생성)"""
+    return _derived("terms", lib, TermIndex)
+
+class Token(NamedTuple):
+    kind: str       # open / close / star / sep / repeat / stitch
+    text: str       # 원문 그대로
+    start: int      # 원문 내 위치 [start, end)
+    end: int
+    value: Any = None   # stitch: (토큰, 개수) / repeat: (횟수, '반복' 여부)
+
+def tokenize(s: str, table: Optional[DeltaTable] = None) -> List[Token]:
+    """
+    서술형 문자열을 한 번 훑어 토큰 리스트로 (공백 제외, 원문 위치 포함)
+    table을 주면 사전의 여러 단어짜리 용어("yarn over")도 한 토큰으로 인식
+    """
+    out: List[Token] = []
     if not s:
-        return []
-    # 표준화: 한글 '회'는 그대로, 곱하기 ×, x, X 섞여도 처리
-    s = s.replace("×", "x")
-    tokens: List[str] = []
-    idx = 0
-
-    while idx < len(s):
-        m = TOKEN_RE.search(s, idx)
-        if not m:
-            # 남은 문자열 쪼개기 (토큰성이 낮은 잔여는 무시)
-            rest = s[idx:].strip()
-            if rest:
-                # 쉼표/세미콜론 제거 후 공백 분리
-                rest = rest.strip(",;")
-                parts = [p for p in re.split(r"\s+", rest) if p]
-                tokens.extend(parts)
+        return out
+    lex_re = table.lex_re if table is not None else LEX_RE
+    for m in lex_re.finditer(s):
+        if m.group("ws"):
+            continue
+        start, end = m.span()
+        text = m.group(0)
+        n = m.group("mul") or m.group("rep")
+        if table is not None and m.group("phrase"):
+            out.append(Token("stitch", text, start, end, (text.lower(), 1)))
+        elif n:
+            explicit = bool(m.group("mul_rep") or m.group("rep_rep"))
+            out.append(Token("repeat", text, start, end, (int(n), explicit)))
+        elif m.group("kn"):
+            out.append(Token("stitch", text, start, end, (m.group("kn").lower(), int(m.group("kn_n")))))
+        elif m.group("word"):
+            out.append(Token("stitch", text, start, end, (text.lower(), 1)))
+        else:
+            out.append(Token(m.lastgroup, text, start, end))
+    return out
+
+# ------------------------------------------------------------
+# 반복 트리 (sequence / repeat(n) / stitch)
+#   - "[k2, p2] x 400" 같은 줄도 토큰을 미리 펼치지 않고 구조로만 보관
+#   - 순회(iter)할 때 토큰을 하나씩 지연 생성 → 메모리는 도안 텍스트 길이에 비례
+#   - Stitch/Repeat는 원문 위치(span)를 들고 있어 UI 하이라이트에 재파싱 불필요
+# ------------------------------------------------------------
+
+Span = Tuple[int, int]
+
+class Stitch:
+    """단일 스티치 토큰 (kN/pN처럼 같은 토큰이 count번 연속되는 경우 포함)"""
+    __slots__ = ("token", "count", "span")
+
+    def __init__(self, token: str, count: int = 1, span: Optional[Span] = None):
+        self.token = token
+        self.count = count
+        self.span = span
+
+    def __iter__(self) -> Iterator[str]:
+        return repeat(self.token, self.count)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        return f"Stitch({self.token!r}, {self.count})" if self.count != 1 else f"Stitch({self.token!r})"
+
+
+class Repeat:
+    """body를 times번 반복하는 노드 (span: 여는 괄호 ~ 반복 표기 끝)"""
+    __slots__ = ("body", "times", "span")
+
+    def __init__(self, body: "Seq", times: int, span: Optional[Span] = None):
+        self.body = body
+        self.times = times
+        self.span = span
+
+    def __iter__(self) -> Iterator[str]:
+        for _ in range(self.times):
+            yield from self.body
+
+    def __len__(self) -> int:
+        return len(self.body) * self.times
+
+    def __repr__(self) -> str:
+        return f"Repeat({self.body!r}, {self.times})"
+
+
+class Seq:
+    """노드들을 순서대로 잇는 시퀀스"""
+    __slots__ = ("items",)
+
+    def __init__(self, items: Optional[List["Node"]] = None):
+        self.items: List["Node"] = items if items is not None else []
+
+    def __iter__(self) -> Iterator[str]:
+        return chain.from_iterable(self.items)
+
+    def __len__(self) -> int:
+        return sum(len(it) for it in self.items)
+
+    def __repr__(self) -> str:
+        return f"Seq({self.items!r})"
+
+
+Node = Union[Stitch, Repeat, Seq]
+
+
+def _node_start(node: Node) -> Optional[int]:
+    if isinstance(node, Seq):
+        return _node_start(node.items[0]) if node.items else None
+    return node.span[0] if node.span else None
+
+
+class _Group:
+    """파싱 중에만 쓰는 임시 표식: 반복 표기가 붙기 전의 괄호/별표 그룹"""
+    __slots__ = ("body", "start")
+
+    def __init__(self, body: Seq, start: int):
+        self.body = body
+        self.start = start
+
+
+def _flatten(items: List[Any]) -> List[Node]:
+    """반복이 붙지 않은 그룹은 괄호를 벗겨 바깥 시퀀스에 이어 붙임"""
+    out: List[Node] = []
+    for x in items:
+        if isinstance(x, _Group):
+            out.extend(x.body.items)
+        else:
+            out.append(x)
+    return out
+
+
+def _at_end(toks: List[Token], i: int, stops: Tuple[str, ...]) -> bool:
+    """i부터 구분자만 남았거나 바로 현재 그룹이 끝나는지 (줄 끝 반복 표기 판단용)"""
+    while i < len(toks) and toks[i].kind == "sep":
+        i += 1
+    return i == len(toks) or toks[i].kind in stops
+
+
+def _parse_items(toks: List[Token], i: int, stops: Tuple[str, ...]) -> Tuple[Seq, int]:
+    """
+    재귀 하강 파서: stops 중 하나를 만나면 (소비하지 않고) 멈춤
+    - [ ... ] / ( ... ) / * ... * 는 그룹, 바로 뒤에 반복 표기가 오면 Repeat
+    - 그룹이 아닌 항목 뒤의 반복 표기는 그 항목만,
+      "n회 반복"처럼 반복이 명시되거나 줄(그룹) 끝의 "x3", "3 times"면 줄 전체를 반복
+    각 토큰은 정확히 한 번만 방문 → 선형 시간
+    """
+    items: List[Any] = []
+    last_is_item = False    # 직전 토큰이 반복 표기를 받을 수 있는 항목인지
+
+    while i < len(toks):
+        tok = toks[i]
+        kind = tok.kind
+        if kind in stops:
             break
 
-        start, end = m.span()
-        # 매치 이전의 느슨한 텍스트 처리 (콤마/세미콜론 제거)
-        pre = s[idx:start].strip(" ,;")
-        if pre:
-            tokens.extend([p for p in re.split(r"\s+", pre) if p])
-
-        g = m.groups()
-        # 그룹 순서에 주의: 위 정규식의 각 케이스와 매칭
-        if g[0] and g[1]:     # * ... * n회
-            inner, n = g[0], int(g[1])
-            inner_expanded = expand_sequence(inner)
-            tokens.extend(inner_expanded * n)
-        elif g[2] and g[3]:   # [ ... ] n회
-            inner, n = g[2], int(g[3])
-            inner_expanded = expand_sequence(inner)
-            tokens.extend(inner_expanded * n)
-        elif g[4] and g[5]:   # kN / pN
-            base, num = g[4].lower(), int(g[5])
-            tokens.extend([base] * num)
-        elif g[6]:            # 단일 토큰
-            tokens.append(g[6].lower())
-
-        idx = end
-
-    # 최종 정리: 콤마/세미콜론 제거 + 공백 제거
-    tokens = [t.strip().strip(",;").lower() for t in tokens if t.strip() and t.strip() not in [",",";"]]
-    return tokens
-
-def stitch_delta(tok: str, lib: Dict[str, Any]) -> int:
-    """
-    토큰이 코수에 주는 변화량
-    """
-    if not tok:
-        return 0
-    key = tok.lower()
-
-    # 기본 스티치
-    if key in ("k", "p"):
-        return 0
-
-    # m1L/m1R 대소문자 이슈 보정
-    lib_key = key.upper() if key.startswith("m1") else key
-    if lib_key in lib:
-        return int(lib[lib_key].get("delta", 0))
-
-    # 백업 매핑
-    mapping = {"yo": 1, "m1l": 1, "m1r": 1, "k2tog": -1, "p2tog": -1, "ssk": -1, "ssp": -1}
-    return mapping.get(key, 0)
-
-def compute_counts(tokens: List[str], start_sts: int, lib: Dict[str, Any]) -> List[Tuple[int, str, int, int]]:
+        if kind == "open":
+            body, i = _parse_items(toks, i + 1, ("close",))
+            if i < len(toks):
+                i += 1                      # 닫는 괄호 소비
+            items.append(_Group(body, tok.start))
+            last_is_item = True
+            continue
+
+        if kind == "star":
+            body, i = _parse_items(toks, i + 1, ("star",) + stops)
+            if i < len(toks) and toks[i].kind == "star":
+                i += 1                      # 닫는 * 소비
+                items.append(_Group(body, tok.start))
+                last_is_item = True
+            else:
+                # 짝이 없는 * → 그냥 이어지는 시퀀스로 취급
+                items.extend(body.items)
+                last_is_item = False
+            continue
+
+        if kind == "stitch":
+            name, n = tok.value
+            items.append(Stitch(name, n, (tok.start, tok.end)))
+            last_is_item = True
+        elif kind == "repeat" and last_is_item:
+            times, explicit = tok.value
+            prev = items[-1]
+            if isinstance(prev, _Group):
+                items[-1] = Repeat(prev.body, times, (prev.start, tok.end))
+            elif explicit or _at_end(toks, i + 1, stops):
+                # "k2tog, yo 3회 반복", "k2tog, yo x3" → 지금까지의 줄(그룹 안이면 그룹) 전체 반복
+                body = Seq(_flatten(items))
+                start = _node_start(body)
+                items = [Repeat(body, times, (tok.start if start is None else start, tok.end))]
+            else:
+                items[-1] = Repeat(Seq([prev]), times, (_node_start(prev), tok.end))
+            last_is_item = False
+        else:
+            # 구분자, 앞 항목 없는 반복 표기, 짝 없는 닫는 괄호 등
+            last_is_item = False
+        i += 1
+
+    return Seq(_flatten(items)), i
+
+
+def parse_sequence(s: str, table: Optional[DeltaTable] = None) -> Seq:
+    """
+    서술형 문자열을 반복 트리로 파싱 (토큰을 펼치지 않음)
+    예) "[k2, p2] x 400" -> Seq([Repeat(Seq([Stitch('k', 2), Stitch('p', 2)]), 400)])
+    list(parse_sequence(s)) == expand_sequence(s)
+    """
+    seq, _ = _parse_items(tokenize(s, table), 0, ())
+    return seq
+
+
+# ------------------------------------------------------------
+# 파싱 캐시 (정규화한 텍스트 기준 LRU)
+#   - Streamlit 재실행, "Rep rows 3–4"처럼 같은 줄이 반복될 때 렉싱/파싱 생략
+#   - 캐시된 트리는 여러 호출이 공유하므로 수정하면 안 됨
+#   - 트리의 span은 정규화된 텍스트 기준 (원문 하이라이트에는 parse_sequence 사용)
+# ------------------------------------------------------------
+PARSE_CACHE_SIZE = 1024
+
+_WS_RE = re.compile(r"\s+")
+
+def normalize_instruction(s: str) -> str:
+    """캐시 키용 정규화: 공백 압축, ×/X → x, 대소문자 통일"""
+    if not s:
+        return ""
+    return _WS_RE.sub(" ", s).strip().replace("×", "x").casefold()
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_normalized(norm: str, table: Optional[DeltaTable]) -> Seq:
+    return parse_sequence(norm, table)
+
+def parse_cached(s: str, table: Optional[DeltaTable] = None) -> Seq:
+    """parse_sequence + LRU 캐시 (같은 줄은 한 번만 파싱)"""
+    return _parse_normalized(normalize_instruction(s), table)
+
+def parse_cache_info():
+    """캐시 적중/실패 횟수: (hits, misses, maxsize, currsize)"""
+    return _parse_normalized.cache_info()
+
+def clear_parse_cache() -> None:
+    _parse_normalized.cache_clear()
+
+
+def iter_tokens(s: str) -> Iterator[str]:
+    """expand_sequence의 지연 버전: 토큰을 하나씩 생성"""
+    return iter(parse_sequence(s))
+
+
+def iter_spans(node: Node) -> Iterator[Tuple[str, Span]]:
+    """
+    (토큰, 원문 위치)를 전개 순서대로 지연 생성
+    반복된 토큰은 같은 위치를 여러 번 돌려줌
+    """
+    if isinstance(node, Stitch):
+        for _ in range(node.count):
+            yield node.token, node.span
+    elif isinstance(node, Repeat):
+        for _ in range(node.times):
+            yield from iter_spans(node.body)
+    else:
+        for it in node.items:
+            yield from iter_spans(it)
+
+
+def expand_sequence(s: str) -> List[str]:
+    """
+    서술형 문자열을 토큰 리스트로 전개 (parse_sequence 결과를 펼친 얇은 래퍼)
+    예) "[(p, k) x 6, m1L] x 8" -> ["p","k","p","k",...,"m1l", ...] (소문자 표준화)
+    """
+    return list(parse_sequence(s))
+
+def stitch_delta(tok: str, lib: Union[Dict[str, Any], DeltaTable]) -> int:
+    """
+    토큰이 코수에 주는 변화량 (사전 delta 필드 기준, 모르는 토큰은 0)
+    """
+    return _as_table(lib).delta(tok)
+
+class StitchCounts:
+    """
+    compute_counts 결과 (배열 기반)
+    - codes : 스텝별 토큰 코드 (vocab 인덱스)
+    - deltas: 스텝별 Δ코수 (vocab 단위 변화량을 한 번에 gather)
+    - counts: 스텝별 누적 기대 코수 (cumsum)
+    (스텝, 토큰, 기대코수, Δ코수) 튜플은 인덱싱/순회할 때만 만들어짐
+    """
+    __slots__ = ("vocab", "codes", "deltas", "counts")
+
+    def __init__(self, vocab: List[str], codes: np.ndarray, vocab_deltas: np.ndarray, start_sts: int):
+        self.vocab = vocab
+        self.codes = codes
+        self.deltas = vocab_deltas[codes]
+        self.counts = np.cumsum(self.deltas, dtype=np.int64) + int(start_sts)
+
+    def __len__(self) -> int:
+        return int(self.codes.shape[0])
+
+    def _row(self, i: int) -> Tuple[int, str, int, int]:
+        return (i + 1, self.vocab[self.codes[i]], int(self.counts[i]), int(self.deltas[i]))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("step index out of range")
+        return self._row(i)
+
+    def __iter__(self) -> Iterator[Tuple[int, str, int, int]]:
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def tolist(self) -> List[Tuple[int, str, int, int]]:
+        return list(self)
+
+
+def _tree_codes(node: Node, index: Dict[str, int]) -> np.ndarray:
+    """트리를 펼치지 않고 토큰 코드 배열 생성 (kN은 full, 반복은 tile)"""
+    if isinstance(node, Stitch):
+        code = index.setdefault(node.token, len(index))
+        return np.full(node.count, code, dtype=np.int32)
+    if isinstance(node, Repeat):
+        return np.tile(_tree_codes(node.body, index), node.times)
+    if not node.items:
+        return np.empty(0, dtype=np.int32)
+    return np.concatenate([_tree_codes(it, index) for it in node.items])
+
+
+def compute_counts(tokens: Union[Iterable[str], Node], start_sts: int,
+                   lib: Union[Dict[str, Any], DeltaTable]) -> StitchCounts:
     """
     각 스텝별 누적 기대 코수 계산
-    반환: [(스텝, 토큰, 기대코수, Δ코수), ...]
-    """
-    cur = int(start_sts)
-    out: List[Tuple[int, str, int, int]] = []
-    step = 1
-    for t in tokens:
-        d = stitch_delta(t, lib)
-        cur += d
-        out.append((step, t, cur, d))
-        step += 1
-    return out
+    tokens: 토큰 리스트(임의의 iterable 가능) 또는 parse_sequence 트리 (트리면 토큰 리스트를 만들지 않음)
+    반환: StitchCounts — [(스텝, 토큰, 기대코수, Δ코수), ...]처럼 인덱싱/순회 가능
+    """
+    table = _as_table(lib)
+    index: Dict[str, int] = {}
+    if isinstance(tokens, (Stitch, Repeat, Seq)):
+        codes = _tree_codes(tokens, index)
+    else:
+        # 길이를 알면 배열을 한 번에 할당 (iter_tokens 같은 제너레이터는 그대로 순회)
+        count = len(tokens) if hasattr(tokens, "__len__") else -1
+        codes = np.fromiter((index.setdefault(t, len(index)) for t in tokens),
+                            dtype=np.int32, count=count)
+    vocab = list(index)
+    vocab_deltas = np.array([table.delta(t) for t in vocab], dtype=np.int64)
+    return StitchCounts(vocab, codes, vocab_deltas, start_sts)
+
+def _tally(node: Node, table: DeltaTable, cur: int, depth: int, mult: int,
+           repeats: List[Dict[str, Any]], by_token: Dict[str, int]) -> Tuple[int, int]:
+    """(토큰 수, 변화량) — 반복 블록은 본문을 한 번만 계산하고 곱한다"""
+    if isinstance(node, Stitch):
+        by_token[node.token] = by_token.get(node.token, 0) + node.count * mult
+        return node.count, table.delta(node.token) * node.count
+
+    if isinstance(node, Repeat):
+        rec: Dict[str, Any] = {"depth": depth, "times": node.times, "start": cur}
+        repeats.append(rec)
+        n, d = _tally(node.body, table, cur, depth + 1, mult * node.times, repeats, by_token)
+        rec.update({
+            "body_stitches": n,
+            "body_delta": d,
+            "stitches": n * node.times,
+            "delta": d * node.times,
+            "end": cur + d * node.times,
+        })
+        return n * node.times, d * node.times
+
+    n_tot, d_tot = 0, 0
+    for it in node.items:
+        n, d = _tally(it, table, cur + d_tot, depth, mult, repeats, by_token)
+        n_tot += n
+        d_tot += d
+    return n_tot, d_tot
+
+def count_tree(node: Node, start_sts: int, lib: Union[Dict[str, Any], DeltaTable]) -> Dict[str, Any]:
+    """
+    반복 트리에서 코 수를 닫힌 형태로 계산 (토큰을 펼치지 않음)
+    반환: {"start", "stitches"(전개 시 토큰 수), "delta", "expected_end", "repeats", "by_token"}
+    repeats: 반복 블록마다 {"depth", "times", "start", "end",
+                           "body_stitches", "body_delta", "stitches", "delta"}
+             (start/end는 해당 블록이 처음 등장할 때의 코 수)
+    by_token: 전개했을 때 토큰별 등장 횟수
+    """
+    table = _as_table(lib)
+    start = int(start_sts)
+    repeats: List[Dict[str, Any]] = []
+    by_token: Dict[str, int] = {}
+    n, d = _tally(node, table, start, 0, 1, repeats, by_token)
+    return {"start": start, "stitches": n, "delta": d, "expected_end": start + d,
+            "repeats": repeats, "by_token": by_token}
+
+# ------------------------------------------------------------
+# 여러 단(줄) 도안 코 수 추적
+# ------------------------------------------------------------
+# 줄 끝에 따로 적힌 코 수 표기: "(60 sts)", "[60코]", "- 60코", "= 60 sts"
+#   괄호나 -, = 로 구분된 경우만 인정 ("겉뜨기 2코, 안뜨기 2코" 의 마지막 "2코"는 코 수 표기가 아님)
+_STATED_UNIT = r"\s*(?:sts?|stitches|코)"
+_STATED_RE = re.compile(
+    r"(?:[(\[]\s*(\d+)" + _STATED_UNIT + r"\s*[)\]]"
+    r"|(?<!\w)[\-–—=]\s*(\d+)" + _STATED_UNIT + r")\s*\.?\s*$",
+    re.IGNORECASE,
+)
+
+def _content_key(text: str) -> str:
+    return hashlib.sha1(normalize_instruction(text).encode("utf-8")).hexdigest()
+
+class StitchTracker:
+    """
+    여러 단 도안의 코 수 추적
+    - 각 단의 끝 코 수를 다음 단의 시작 코 수로 이어 감
+    - 단별 계산(토큰 수, 변화량)은 내용 해시로 캐시 → 같은 줄은 한 번만 계산
+    - 줄을 고치면 그 단만 다시 계산하고, 누적 코 수는 그 단부터 뒤로만 갱신
+    - 지금 없는 줄의 결과는 쌓이면 정리 (세션 내내 늘어나지 않도록)
+    """
+
+    def __init__(self, start_sts: int, lib: Union[Dict[str, Any], DeltaTable], rows: Optional[List[str]] = None):
+        self.table = _as_table(lib)
+        self.start_sts = int(start_sts)
+        self._rows: List[str] = []
+        self._keys: List[str] = []
+        self._ends: List[int] = []     # 계산이 끝난 앞쪽 단들의 끝 코 수
+        self._by_key: Dict[str, Dict[str, Any]] = {}
+        self.recomputed = 0     # 마지막 results() 에서 누적 코 수를 다시 계산한 단 수
+        if rows:
+            self.set_rows(rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _row_result(self, key: str, text: str) -> Dict[str, Any]:
+        res = self._by_key.get(key)
+        if res is None:
+            # 코 수 표기는 떼고 파싱 ("k2tog, yo x3 (10 sts)"의 x3도 줄 끝 반복으로)
+            m = _STATED_RE.search(text)
+            body = text[:m.start()] if m else text
+            tally = count_tree(parse_cached(body, self.table), 0, self.table)
+            res = self._by_key[key] = {
+                "stitches": tally["stitches"],
+                "delta": tally["delta"],
+                "stated": int(m.group(1) or m.group(2)) if m else None,
+            }
+        return res
+
+    def _touch(self, i: int) -> None:
+        # i번째 단부터 누적 코 수 무효화
+        del self._ends[i:]
+        # 단별 결과가 현재 줄 수보다 한참 많아지면 현재 줄 것만 남김
+        if len(self._by_key) > 2 * len(self._keys) + 64:
+            live = set(self._keys)
+            self._by_key = {k: v for k, v in self._by_key.items() if k in live}
+
+    def set_start(self, start_sts: int) -> None:
+        if int(start_sts) != self.start_sts:
+            self.start_sts = int(start_sts)
+            self._touch(0)
+
+    def set_rows(self, rows: List[str]) -> None:
+        """전체 줄 목록 교체 — 앞에서부터 같은 줄은 그대로 두고 처음 달라진 단부터 갱신"""
+        keys = [_content_key(r) for r in rows]
+        i = 0
+        while i < min(len(keys), len(self._keys)) and keys[i] == self._keys[i]:
+            i += 1
+        # 대소문자/공백만 바뀐 경우에도 표시용 원문은 새 것으로
+        self._rows = list(rows)
+        if i == len(keys) == len(self._keys):
+            return
+        self._keys = keys
+        self._touch(i)
+
+    def update(self, i: int, text: str) -> None:
+        """i번째 단(0부터) 수정"""
+        key = _content_key(text)
+        self._rows[i] = text
+        if key != self._keys[i]:
+            self._keys[i] = key
+            self._touch(i)
+
+    def append(self, text: str) -> None:
+        self._rows.append(text)
+        self._keys.append(_content_key(text))
+        self._touch(len(self._rows) - 1)
+
+    def results(self) -> List[Dict[str, Any]]:
+        """
+        단별 결과: [{"row", "text", "start", "delta", "end", "stitches", "stated", "ok"}, ...]
+        stated: 줄 끝에 적힌 코 수(없으면 None), ok: stated와 계산값 일치 여부(없으면 None)
+        """
+        cur = self._ends[-1] if self._ends else self.start_sts
+        self.recomputed = len(self._rows) - len(self._ends)
+        for i in range(len(self._ends), len(self._rows)):
+            cur += self._row_result(self._keys[i], self._rows[i])["delta"]
+            self._ends.append(cur)
+
+        out: List[Dict[str, Any]] = []
+        prev = self.start_sts
+        for i, (text, key, end) in enumerate(zip(self._rows, self._keys, self._ends)):
+            res = self._by_key[key]
+            stated = res["stated"]
+            out.append({
+                "row": i + 1,
+                "text": text,
+                "start": prev,
+                "delta": res["delta"],
+                "end": end,
+                "stitches": res["stitches"],
+                "stated": stated,
+                "ok": None if stated is None else stated == end,
+            })
+            prev = end
+        return out
 
 # (선택) 한 번에 요약까지 뽑는 편의 함수
-def summarize(pattern: str, start_sts: int, lib_path: str) -> Dict[str, Any]:
-    lib = load_lib(lib_path)
-    toks = expand_sequence(pattern)
-    rows = compute_counts(toks, start_sts, lib)
-    end = rows[-1][2] if rows else start_sts
-    return {"tokens": toks, "rows": rows, "expected_end": end}
\ No newline at end of file
+def summarize(pattern: str, start_sts: int, lib_path: str, expand: bool = True) -> Dict[str, Any]:
+    """
+    expand=False면 토큰/스텝 목록을 만들지 않고 반복 구조로 합계만 계산
+    """
+    table = _as_table(load_lib(lib_path))
+    tree = parse_cached(pattern, table)
+    out = count_tree(tree, start_sts, table)
+    if expand:
+        out["tokens"] = list(tree)
+        out["rows"] = compute_counts(tree, start_sts, table)
+    return out
+
+# ------------------------------------------------------------
+# 여러 줄 일괄 요약 (업로드 도안 오프라인 점검용)
+# ------------------------------------------------------------
+_WORKER_TABLE: Optional[DeltaTable] = None
+
+def _init_worker(table: DeltaTable) -> None:
+    global _WORKER_TABLE
+    _WORKER_TABLE = table
+
+def _tally_lines(lines: List[str], table: Optional[DeltaTable] = None) -> List[Tuple[int, int]]:
+    """[(토큰 수, 변화량), ...] — 시작 코 수와 무관한 부분만 계산"""
+    table = table if table is not None else _WORKER_TABLE
+    out: List[Tuple[int, int]] = []
+    for line in lines:
+        res = count_tree(parse_cached(line, table), 0, table)
+        out.append((res["stitches"], res["delta"]))
+    return out
+
+def summarize_many(lines: List[str], start_sts: Union[int, List[int]],
+                   lib: Union[str, Dict[str, Any], DeltaTable], processes: int = 0,
+                   chunk_size: int = 256) -> Dict[str, Any]:
+    """
+    여러 줄을 한 번에 요약 (사전/변화량 표는 한 번만 준비)
+    start_sts: 공통 시작 코 수 또는 줄별 시작 코 수 리스트(사이즈별 변형 등)
+    processes: 0이면 현재 프로세스에서, 그 외에는 프로세스 풀로 줄 묶음을 나눠 계산
+    반환(열 단위): {"line": [...], "start", "stitches", "delta", "expected_end": np.ndarray}
+    """
+    if isinstance(lib, str):
+        # 경로별 JSON 캐시만 사용 (load_lib 처럼 find_term 대상 사전을 바꾸지 않음)
+        entry = _load_json_cached(_resolve_path(lib))
+        if entry is None:
+            raise FileNotFoundError(f"symbols.json을 찾을 수 없습니다: {_resolve_path(lib)}")
+        lib = entry.data
+    table = _as_table(lib)
+    lines = list(lines)
+
+    if np.ndim(start_sts) == 0:
+        starts = np.full(len(lines), start_sts, dtype=np.int64)
+    else:
+        starts = np.asarray(list(start_sts), dtype=np.int64)
+        if starts.shape[0] != len(lines):
+            raise ValueError("start_sts 길이가 lines 길이와 다릅니다.")
+
+    if processes and len(lines) > chunk_size:
+        chunks = [lines[i:i + chunk_size] for i in range(0, len(lines), chunk_size)]
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(table,)) as ex:
+            tallies = [t for part in ex.map(_tally_lines, chunks) for t in part]
+    else:
+        tallies = _tally_lines(lines, table)
+
+    stitches = np.array([t[0] for t in tallies], dtype=np.int64)
+    delta = np.array([t[1] for t in tallies], dtype=np.int64)
+    return {
+        "line": lines,
+        "start": starts,
+        "stitches": stitches,
+        "delta": delta,
+        "expected_end": starts + delta,
+    }
@@ -0,0 +1,303 @@
+# lib/term_index.py
+# 용어 검색용 보조 인덱스
+#   - 한글 음절을 자모로 풀어 n-gram 역색인 (한글 오타에 강한 후보 추리기)
+#   - SymSpell 방식 삭제 이웃 인덱스 (짧은 약어의 1~2글자 오타 교정)
+#   - 약어 사전 페이지용 부분 문자열 역색인 (필드별 조각 bitset)
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from rapidfuzz.distance import DamerauLevenshtein
+
+# 한글 음절(가~힣) → 초성/중성/종성 (호환 자모)
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+
+# 검색 비교 시 무시할 문자 (띄어쓰기/하이픈 차이는 오타로 보지 않음)
+_IGNORED = set(" \t-_")
+
+
+def has_hangul(s: str) -> bool:
+    return any(_HANGUL_FIRST <= ord(ch) <= _HANGUL_LAST for ch in s)
+
+
+def decompose_hangul(s: str) -> str:
+    """
+    한글 음절을 자모로 풀고 소문자화, 공백/하이픈 제거
+    예) "겉뜨기" -> "ㄱㅓㅌㄸㅡㄱㅣ", "K2-tog" -> "k2tog"
+    """
+    out: List[str] = []
+    for ch in s.casefold():
+        if ch in _IGNORED:
+            continue
+        code = ord(ch)
+        if _HANGUL_FIRST <= code <= _HANGUL_LAST:
+            idx = code - _HANGUL_FIRST
+            out.append(_CHO[idx // 588])
+            out.append(_JUNG[(idx % 588) // 28])
+            if idx % 28:
+                out.append(_JONG[idx % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _grams(s: str, n: int) -> List[str]:
+    s = f"^{s}$"
+    if len(s) <= n:
+        return [s]
+    return [s[i:i + n] for i in range(len(s) - n + 1)]
+
+
+class NgramIndex:
+    """
+    자모 n-gram 역색인
+    - 용어(키/별칭/이름)를 자모로 풀어 n-gram -> 용어 id 목록
+    - 검색은 겹치는 n-gram 수로 Dice 점수를 매겨 상위 후보만 돌려줌
+      (비싼 퍼지 점수는 이 후보들에만 적용)
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, str]], n: int = 2):
+        self.n = n
+        self.terms: List[Tuple[str, str]] = []      # (용어 원문, 표준키)
+        self.jamo: List[str] = []                   # 용어 자모 문자열
+        self.sizes: List[int] = []                  # 용어별 n-gram 개수
+        self.postings: Dict[str, List[int]] = {}
+
+        seen = set()
+        for term, key in terms:
+            j = decompose_hangul(term)
+            if not j or (j, key) in seen:
+                continue
+            seen.add((j, key))
+            tid = len(self.terms)
+            self.terms.append((term, key))
+            self.jamo.append(j)
+            grams = set(_grams(j, n))
+            self.sizes.append(len(grams))
+            for g in grams:
+                self.postings.setdefault(g, []).append(tid)
+
+    def search(self, q: str, limit: int = 20, min_score: float = 0.3) -> List[Tuple[str, str, float]]:
+        """
+        return: [(용어, 표준키, Dice 점수 0~1), ...] 점수 내림차순(같으면 색인 순서), 표준키당 1개
+        """
+        j = decompose_hangul(q)
+        if not j:
+            return []
+        grams = set(_grams(j, self.n))
+        hits: Dict[int, int] = {}
+        for g in grams:
+            for tid in self.postings.get(g, ()):
+                hits[tid] = hits.get(tid, 0) + 1
+
+        # 점수가 같으면 먼저 색인된 용어(사전 앞쪽 항목) 우선
+        scored = sorted(
+            ((2.0 * c / (len(grams) + self.sizes[tid]), tid) for tid, c in hits.items()),
+            key=lambda x: (-x[0], x[1]),
+        )
+        out: List[Tuple[str, str, float]] = []
+        keys = set()
+        for score, tid in scored:
+            if score < min_score or len(out) >= limit:
+                break
+            term, key = self.terms[tid]
+            if key in keys:
+                continue
+            keys.add(key)
+            out.append((term, key, score))
+        return out
+
+
+def _deletes(s: str, max_distance: int) -> Set[str]:
+    """s에서 글자를 최대 max_distance개 지운 문자열 전부 (s 자신 포함)"""
+    out = {s}
+    frontier = {s}
+    for _ in range(max_distance):
+        nxt = set()
+        for w in frontier:
+            for i in range(len(w)):
+                d = w[:i] + w[i + 1:]
+                if d not in out:
+                    nxt.add(d)
+        out |= nxt
+        frontier = nxt
+    return out
+
+
+class DeletionIndex:
+    """
+    SymSpell 방식 오타 교정 인덱스
+    - 용어마다 최대 max_distance 글자를 지운 변형을 미리 만들어 변형 -> 용어 id
+    - 검색어도 똑같이 지워 본 뒤 겹치는 용어만 실제 편집 거리(전치 포함)로 확인
+      → 사전 크기와 거의 무관하게 후보를 찾음
+    긴 용어는 변형 수가 많고 오타 교정 대상도 아니므로 max_len 이하만 색인
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, str]], max_distance: int = 2, max_len: int = 10,
+                 min_query_len: int = 3):
+        self.max_distance = max_distance
+        self.max_len = max_len
+        # 1~2글자 검색어는 한 글자만 바꿔도 다른 약어가 됨 ("x" → "k") → 오타 교정 안 함
+        self.min_query_len = min_query_len
+        self.terms: List[Tuple[str, str]] = []      # (소문자 용어, 표준키)
+        self.deletes: Dict[str, List[int]] = {}
+
+        seen = set()
+        for term, key in terms:
+            t = term.casefold().strip()
+            if not t or len(t) > max_len or t in seen:
+                continue
+            seen.add(t)
+            tid = len(self.terms)
+            self.terms.append((t, key))
+            for d in _deletes(t, max_distance):
+                self.deletes.setdefault(d, []).append(tid)
+
+    def allowed_distance(self, q: str) -> int:
+        # 3글자 약어에 2글자 오타를 허용하면 거의 모든 약어가 후보가 됨
+        return min(self.max_distance, max(1, len(q) // 3))
+
+    def lookup(self, q: str) -> List[Tuple[str, str, int]]:
+        """
+        return: [(용어, 표준키, 편집 거리), ...] 거리 → 길이 차이 → 색인 순서로 정렬
+        """
+        q = q.casefold().strip()
+        if len(q) < self.min_query_len or len(q) > self.max_len + self.max_distance:
+            return []
+        limit = self.allowed_distance(q)
+
+        cand: Set[int] = set()
+        for d in _deletes(q, limit):
+            cand.update(self.deletes.get(d, ()))
+
+        out: List[Tuple[int, int, int, str, str]] = []
+        for tid in cand:
+            term, key = self.terms[tid]
+            dist = DamerauLevenshtein.distance(q, term, score_cutoff=limit)
+            if dist <= limit:
+                out.append((dist, abs(len(term) - len(q)), tid, term, key))
+        out.sort()
+        return [(term, key, dist) for dist, _, _, term, key in out]
+
+
+def _bits(bitset: int) -> List[int]:
+    """
+    bitset에 켜진 위치(id) 오름차순
+    바이트로 한 번 바꿔 numpy로 풂 (비트마다 큰 정수를 복사하지 않음 → bitset 크기에 선형)
+    """
+    if not bitset:
+        return []
+    raw = np.frombuffer(bitset.to_bytes((bitset.bit_length() + 7) >> 3, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder="little")).tolist()
+
+
+def _to_bitset(ids: List[int]) -> int:
+    """id 목록 → bitset (id마다 큰 정수 OR 하지 않고 바이트 배열로 한 번에)"""
+    if not ids:
+        return 0
+    buf = bytearray((max(ids) >> 3) + 1)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+class SearchIndex:
+    """
+    약어 사전 페이지용 부분 문자열 검색 역색인 (사전 버전마다 한 번 생성)
+    - 필드(key / name / alias / desc)별로 1~3글자 조각 -> 항목 id bitset
+      · 3글자 이하 검색어는 조각 하나 조회로 끝
+      · 더 긴 검색어는 3글자 조각 bitset을 AND 한 후보만 실제 포함 여부 확인
+    - has_video / is_extra 도 bitset으로 미리 계산 → 필터는 AND 한 번
+    - 검색어가 없을 때의 목록은 필터 조합별로 한 번만 만들어 둠
+    - 순위: 키 일치 > 별칭/이름 일치 > 키 포함 > 별칭/이름 포함 > 설명 포함
+    """
+
+    FIELDS = ("key", "name", "alias", "desc")
+    GRAM = 3
+
+    def __init__(self, entries: Dict[str, Dict[str, Any]], extra_keys: Iterable[str] = (),
+                 videos: Optional[Dict[str, str]] = None):
+        extra_keys = set(extra_keys)
+        self.keys: List[str] = list(entries)
+        self.texts: Dict[str, List[List[str]]] = {f: [] for f in self.FIELDS}
+        self.postings: Dict[str, Dict[str, int]] = {f: {} for f in self.FIELDS}
+        self.exact_key: Dict[str, int] = {}
+        self.exact_label: Dict[str, int] = {}      # 별칭/이름 -> id bitset
+        self.is_extra = 0
+        self.has_video = 0
+        self.all = (1 << len(self.keys)) - 1
+        self._listings: Dict[Tuple[bool, bool], List[str]] = {}   # (only_extra, only_video) -> 키 목록
+
+        for i, key in enumerate(self.keys):
+            item = entries[key]
+            bit = 1 << i
+            names = [item.get("name_en") or "", item.get("name_ko") or ""]
+            aliases = [a for a in item.get("aliases", []) if a]
+            fields = {
+                "key": [key],
+                "name": names,
+                "alias": aliases,
+                "desc": [item.get("desc_ko") or ""],
+            }
+            for f, values in fields.items():
+                values = [v.lower() for v in values if v]
+                self.texts[f].append(values)
+                post = self.postings[f]
+                for v in values:
+                    for n in range(1, self.GRAM + 1):
+                        for j in range(len(v) - n + 1):
+                            g = v[j:j + n]
+                            post[g] = post.get(g, 0) | bit
+
+            self.exact_key.setdefault(key.lower(), i)
+            for label in names + aliases:
+                label = label.lower()
+                self.exact_label[label] = self.exact_label.get(label, 0) | bit
+            if key in extra_keys:
+                self.is_extra |= bit
+            if videos is not None and videos.get(key):
+                self.has_video |= bit
+
+    def _field_hits(self, f: str, q: str) -> int:
+        post = self.postings[f]
+        if len(q) <= self.GRAM:
+            return post.get(q, 0)
+        cand = self.all
+        for j in range(len(q) - self.GRAM + 1):
+            cand &= post.get(q[j:j + self.GRAM], 0)
+            if not cand:
+                return 0
+        texts = self.texts[f]
+        return _to_bitset([i for i in _bits(cand) if any(q in v for v in texts[i])])
+
+    def search(self, q: str, only_extra: bool = False, only_video: bool = False) -> List[str]:
+        """return: 조건에 맞는 키 목록 (검색어가 없으면 사전 순서 그대로)"""
+        mask = self.all
+        if only_extra:
+            mask &= self.is_extra
+        if only_video:
+            mask &= self.has_video
+
+        q = q.strip().lower()
+        if not q:
+            listing = self._listings.get((only_extra, only_video))
+            if listing is None:
+                listing = self._listings[(only_extra, only_video)] = [self.keys[i] for i in _bits(mask)]
+            return list(listing)
+
+        key_hits = self._field_hits("key", q) & mask
+        label_hits = (self._field_hits("name", q) | self._field_hits("alias", q)) & mask & ~key_hits
+        desc_hits = self._field_hits("desc", q) & mask & ~key_hits & ~label_hits
+
+        exact_key = self.exact_key.get(q)
+        exact = (1 << exact_key) & key_hits if exact_key is not None else 0
+        exact_label = self.exact_label.get(q, 0) & (key_hits | label_hits) & ~exact
+
+        out: List[int] = []
+        for tier in (exact, exact_label, key_hits & ~exact & ~exact_label,
+                     label_hits & ~exact_label, desc_hits):
+            out.extend(_bits(tier))
+        return [self.keys[i] for i in out]
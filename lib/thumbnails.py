@@ -0,0 +1,190 @@
+# lib/thumbnails.py
+# 유튜브 썸네일 로컬 캐시
+#
+# - 영상마다 원본 썸네일을 한 번만 받아 표시 크기로 줄인 WebP로 저장
+# - 캐시는 내용 주소 방식: <원본 sha1>_<폭>.webp  (같은 이미지는 한 번만 저장)
+#   refs/<영상 ID> 파일에 원본 sha1을 기록
+# - 캐시 용량이 THUMB_CACHE_MAX_BYTES를 넘으면 오래 안 쓴 파일부터 삭제
+# - 받아오기 실패/시간 초과 시 원격 URL을 그대로 돌려줌 (잠시 동안은 다시 시도하지 않음)
+#
+# 환경 변수:
+#   KNIT_THUMB_ORIGIN     썸네일 서버 (기본 https://img.youtube.com, 테스트용 로컬 서버로 교체 가능)
+#   KNIT_THUMB_CACHE      캐시 폴더 (기본 <프로젝트>/.thumb_cache)
+#   KNIT_THUMB_CACHE_MB   캐시 최대 용량 MB (기본 64)
+
+import io
+import os
+import time
+import hashlib
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parent.parent
+THUMB_ORIGIN = os.environ.get("KNIT_THUMB_ORIGIN", "https://img.youtube.com").rstrip("/")
+CACHE_DIR = Path(os.environ.get("KNIT_THUMB_CACHE", ROOT / ".thumb_cache"))
+THUMB_CACHE_MAX_BYTES = int(os.environ.get("KNIT_THUMB_CACHE_MB", "64")) * 1024 * 1024
+
+FETCH_TIMEOUT = 3.0         # 초
+RETRY_AFTER = 600.0         # 실패한 영상은 10분 동안 원격 URL 사용
+WEBP_QUALITY = 80
+
+_LOCK = threading.Lock()
+_FAILED: Dict[str, float] = {}          # 영상 ID -> 실패 시각
+_CACHE_BYTES: Optional[int] = None      # 캐시 폴더 총 용량 (처음 쓸 때 한 번 계산)
+
+
+def remote_url(video_id: str) -> str:
+    return f"{THUMB_ORIGIN}/vi/{video_id}/hqdefault.jpg"
+
+
+def _variant_path(digest: str, width: int) -> Path:
+    return CACHE_DIR / f"{digest}_{width}.webp"
+
+
+def _ref_path(video_id: str) -> Path:
+    return CACHE_DIR / "refs" / video_id
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def _resize_webp(raw: bytes, width: int) -> bytes:
+    with Image.open(io.BytesIO(raw)) as img:
+        img = img.convert("RGB")
+        if img.width > width:
+            img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, "WEBP", quality=WEBP_QUALITY, method=4)
+    return buf.getvalue()
+
+
+# -----------------------------------------------------------------------------
+# 용량 관리
+# -----------------------------------------------------------------------------
+def _cache_files():
+    if not CACHE_DIR.exists():
+        return []
+    return [p for p in CACHE_DIR.glob("*.webp") if p.is_file()]
+
+
+def _add_bytes(n: int) -> None:
+    global _CACHE_BYTES
+    with _LOCK:
+        if _CACHE_BYTES is None:
+            _CACHE_BYTES = sum(p.stat().st_size for p in _cache_files())
+        else:
+            _CACHE_BYTES += n
+        over = _CACHE_BYTES > THUMB_CACHE_MAX_BYTES
+    if over:
+        evict()
+
+
+def evict(max_bytes: Optional[int] = None) -> int:
+    """
+    오래 안 쓴(mtime 기준) 썸네일부터 지워 max_bytes의 80% 이하로 맞춤
+    return: 지운 파일 수
+    """
+    global _CACHE_BYTES
+    limit = THUMB_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _LOCK:
+        files = []
+        for p in _cache_files():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        if total > limit:
+            target = int(limit * 0.8)
+            for _, size, p in sorted(files, key=lambda x: x[0]):
+                if total <= target:
+                    break
+                p.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+        _CACHE_BYTES = total
+    return removed
+
+
+# -----------------------------------------------------------------------------
+# 조회
+# -----------------------------------------------------------------------------
+def _local_path(video_id: str, width: int) -> Optional[Path]:
+    """이미 받아 둔 썸네일 경로 (ref 나 파일이 없거나 그 사이 지워졌으면 None)"""
+    try:
+        digest = _ref_path(video_id).read_text().strip()
+    except OSError:
+        return None
+    if not digest:
+        return None
+    path = _variant_path(digest, width)
+    return path if path.exists() else None
+
+
+def cached_thumbnail(video_id: str, width: int = 350) -> Optional[Path]:
+    """
+    로컬 썸네일 경로 (없으면 받아서 만듦)
+    실패하면 None
+    """
+    if not video_id:
+        return None
+
+    path = _local_path(video_id, width)
+    if path is not None:
+        try:
+            os.utime(path)  # 최근 사용 표시 (삭제 순서용)
+            return path
+        except FileNotFoundError:
+            pass            # 다른 스레드의 evict()가 방금 지움 → 다시 받음
+
+    failed_at = _FAILED.get(video_id)
+    if failed_at is not None and time.time() - failed_at < RETRY_AFTER:
+        return None
+
+    try:
+        with urllib.request.urlopen(remote_url(video_id), timeout=FETCH_TIMEOUT) as resp:
+            raw = resp.read()
+        digest = hashlib.sha1(raw).hexdigest()
+        path = _variant_path(digest, width)
+        if not path.exists():
+            data = _resize_webp(raw, width)
+            _write_atomic(path, data)
+            _add_bytes(len(data))
+        _write_atomic(_ref_path(video_id), digest.encode())
+    except Exception:
+        _FAILED[video_id] = time.time()
+        return None
+
+    _FAILED.pop(video_id, None)
+    return path
+
+
+def thumbnail_for(video_id: str, width: int = 350) -> str:
+    """
+    영상 ID → st.image 에 넘길 썸네일 (로컬 파일 경로, 실패 시 원격 URL, ID가 없으면 "")
+    """
+    if not video_id:
+        return ""
+    path = cached_thumbnail(video_id, width)
+    return str(path) if path is not None else remote_url(video_id)
+
+
+def prefetch(video_ids: Iterable[str], width: int = 350, workers: int = 8) -> None:
+    """화면에 보일 썸네일들을 동시에 받아 둠 (느린 서버에서 한 장씩 기다리지 않도록)"""
+    ids = {i for i in video_ids if i}
+    missing = [i for i in ids if _local_path(i, width) is None]
+    if not missing:
+        return
+    with ThreadPoolExecutor(max_workers=min(workers, len(missing))) as ex:
+        list(ex.map(lambda i: cached_thumbnail(i, width), missing))
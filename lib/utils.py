@@ -2,9 +2,9 @@
 import re
 from urllib.parse import urlparse, parse_qs
 
-def get_youtube_thumbnail(url: str) -> str:
+def youtube_video_id(url: str) -> str:
     """
-    유튜브 '영상' URL에서 썸네일 이미지 URL 반환.
+    유튜브 '영상' URL에서 영상 ID 추출.
     - https://youtu.be/VIDEO_ID?si=...
     - https://www.youtube.com/watch?v=VIDEO_ID&...
     - https://www.youtube.com/shorts/VIDEO_ID?...
@@ -54,7 +54,81 @@ def get_youtube_thumbnail(url: str) -> str:
         if m:
             video_id = m.group(1)
 
+    return video_id
+
+def get_youtube_thumbnail(url: str) -> str:
+    """
+    유튜브 '영상' URL에서 썸네일 이미지 URL 반환.
+    실패하면 ""(빈 문자열) 반환.
+    """
+    video_id = youtube_video_id(url)
     if not video_id:
         return ""
 
-    return f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
\ No newline at end of file
+    return f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
+
+def is_playlist_only(url: str) -> bool:
+    """playlist 단독 링크(list=... 만 있고 watch?v= 없음)인지"""
+    return "list=" in url and "watch?v=" not in url and "youtu.be" not in url
+
+# 유튜브 영상 ID 형식 (11글자)
+_VIDEO_ID_RE = re.compile(r"[A-Za-z0-9_-]{11}")
+
+def is_youtube_url(url: str) -> bool:
+    """youtube.com / youtu.be (하위 도메인 포함) 링크인지"""
+    try:
+        host = (urlparse(url if "//" in url else "//" + url).hostname or "").lower()
+    except ValueError:
+        return False
+    return host == "youtu.be" or host == "youtube.com" or host.endswith(".youtube.com")
+
+def video_record(v: dict) -> dict:
+    """
+    videos 항목 하나({"title", "url"})를 표시용 필드까지 채운 레코드로 변환.
+    - video_id / watch_url(정규화된 시청 링크) / thumbnail_url / playlist_only
+    - 유튜브 영상 링크가 아니면 video_id="" 이고 watch_url 은 원래 url 그대로
+    수집 시점과 사전 빌드 시점에 한 번만 계산해 두고, 화면에서는 필드만 읽음.
+    """
+    url = (v.get("url") or "").strip()
+    playlist_only = is_playlist_only(url)
+    video_id = ""
+    if url and not playlist_only and is_youtube_url(url):
+        video_id = youtube_video_id(url if "//" in url else "https://" + url).strip()
+        if not _VIDEO_ID_RE.fullmatch(video_id):
+            video_id = ""
+    return {
+        **v,
+        "title": v.get("title") or "",
+        "url": url,
+        "video_id": video_id,
+        "watch_url": f"https://www.youtube.com/watch?v={video_id}" if video_id else url,
+        "thumbnail_url": f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg" if video_id else "",
+        "playlist_only": playlist_only,
+    }
+
+def normalize_videos(vlist) -> list:
+    """videos 목록 전체를 video_record 로 변환 (url 없는 항목은 버림)"""
+    if not isinstance(vlist, list):
+        return []
+    return [video_record(v) for v in vlist if isinstance(v, dict) and (v.get("url") or "").strip()]
+
+def pick_video_record(vlist):
+    """정규화된 videos 목록에서 첫 번째 개별 영상 레코드 (없으면 None)"""
+    for v in vlist or []:
+        if "playlist_only" not in v:
+            v = video_record(v)
+        if v["url"] and not v["playlist_only"]:
+            return v
+    return None
+
+def pick_video(vlist) -> str:
+    """
+    영상 목록에서 '개별 영상 링크'만 골라 첫 번째 것을 반환.
+    playlist 단독 링크(list=... 만 있고 watch?v= 없음)는 제외.
+    없으면 ""(빈 문자열) 반환.
+    """
+    if not isinstance(vlist, list):
+        return ""
+
+    rec = pick_video_record(vlist)
+    return rec["url"] if rec else ""
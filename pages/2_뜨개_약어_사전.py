@@ -1,54 +1,32 @@
 # pages/2_뜨개_약어_사전.py
 
-import json
-from pathlib import Path
 import streamlit as st
-from lib import parser
-from lib.utils import get_youtube_thumbnail
+from lib import lexicon_db
+from lib.lexicon import STORE, load_lexicon
+from lib.term_index import SearchIndex
+from lib.thumbnails import prefetch, thumbnail_for
 
 
 st.title("🧶 뜨개 약어 사전 (대형 썸네일 + YouTube 링크)")
 
-BASE_PATH = "symbols.json"
-EXTRA_PATH = "symbols_extra.json"
+# 병합 사전/검색 인덱스/대표 영상(ID, 시청 링크, 썸네일 URL)은 lib/lexicon.pkl 에 미리 컴파일되어 있음
+# (원본 JSON이 바뀐 경우에만 다시 빌드)
+LEXICON = load_lexicon()
+merged = LEXICON.merged
+extra = LEXICON.extra_keys
+videos = LEXICON.videos
 
 
-# ----------------------------------------
-# JSON 안전 로딩
-# ----------------------------------------
-def load_json_safe(filename: str) -> dict:
-    try:
-        return parser.load_lib(filename)
-    except:
-        return {}
-
+# lib/lexicon.db 가 있으면 (python lib/lexicon_db.py init) SQLite 색인으로 검색
+@st.cache_resource(show_spinner=False)
+def open_db():
+    return lexicon_db.connect() if lexicon_db.is_enabled() else None
 
-base = load_json_safe(BASE_PATH)
-extra = load_json_safe(EXTRA_PATH)
 
-# 병합
-merged = {**base, **extra}
-
-
-# ----------------------------------------
-# 영상에서 '개별 영상 링크만' 추출
-# ----------------------------------------
-def pick_video(vlist):
-    if not isinstance(vlist, list):
-        return ""
-
-    for v in vlist:
-        url = (v.get("url") or "").strip()
-        if not url:
-            continue
-
-        # playlist 단독 제외
-        if "list=" in url and "watch?v=" not in url and "youtu.be" not in url:
-            continue
-
-        return url
-
-    return ""
+DB = open_db()
+if DB is not None:
+    # symbols*.json / video_overrides.json 이 바뀌었으면 DB도 사전과 같게 맞춤
+    lexicon_db.ensure_synced(DB, LEXICON)
 
 
 # ----------------------------------------
@@ -67,57 +45,103 @@ with col3:
 
 
 # 필터링
-def match(x):
-    return q.lower() in str(x).lower()
+if DB is not None:
+    keys = lexicon_db.search(DB, q, only_extra=only_new, only_video=only_video)
+else:
+    # 사전 버전마다 한 번 만든 역색인 → 입력할 때마다 사전 전체를 돌지 않음
+    # (키 일치 > 별칭/이름 일치 > 키 포함 > 별칭/이름 포함 > 설명 포함 순)
+    index = STORE.derived(
+        "search_index", lambda lex: SearchIndex(lex.merged, lex.extra_keys, lex.videos)
+    )
+    keys = index.search(q, only_extra=only_new, only_video=only_video)
 
 
-filtered = {}
 
-for key, item in merged.items():
-    if q:
-        if not (
-            match(key)
-            or match(item.get("name_en", ""))
-            or match(item.get("name_ko", ""))
-            or match(item.get("desc_ko", ""))
-            or any(match(a) for a in item.get("aliases", []))
-        ):
-            continue
+# 글자 그대로 일치하는 항목이 없으면 자모 n-gram 인덱스로 비슷한 용어 추천 (한글 오타 대응)
+if q and not keys:
+    suggestions = LEXICON.terms.ngram.search(q, limit=5, min_score=0.4)
+    keys = [
+        key for _, key, _ in suggestions
+        if not (only_new and key not in extra) and not (only_video and not videos.get(key))
+    ]
+    if keys:
+        st.caption("정확히 일치하는 용어가 없어 비슷한 용어를 보여 줍니다.")
 
-    if only_new and key not in extra:
-        continue
 
-    video = pick_video(item.get("videos", []))
-    if only_video and not video:
-        continue
+# ----------------------------------------
+# 페이지 나누기 (한 번에 page_size개만 렌더링 → 사전 크기와 무관하게 일정)
+# ----------------------------------------
+PAGE_SIZES = [10, 20, 50, 100]
 
-    filtered[key] = item
+opt1, opt2, opt3 = st.columns([1, 1, 1])
 
+with opt1:
+    page_size = st.selectbox("한 페이지에 표시", PAGE_SIZES, index=1)
 
-st.write(f"총 **{len(filtered)}개** 용어 표시")
+with opt2:
+    compact = st.radio("보기 방식", ["카드(썸네일)", "간단 목록"], horizontal=True) == "간단 목록"
 
+n_pages = max(1, -(-len(keys) // page_size))
 
-# ----------------------------------------
-# 카드 렌더링 (썸네일 크게)
-# ----------------------------------------
-for key, item in filtered.items():
-    st.markdown("---")
-    st.markdown(f"## 🔹 **{key}** — {item.get('name_en','')} / {item.get('name_ko','')}")
+# 검색 조건이 바뀌면 첫 페이지로
+view_key = (q, only_new, only_video, page_size)
+if st.session_state.get("dict_view_key") != view_key:
+    st.session_state["dict_view_key"] = view_key
+    st.session_state["dict_page"] = 1
+st.session_state["dict_page"] = min(st.session_state.get("dict_page", 1), n_pages)
 
-    st.write(item.get("desc_ko", "(설명 없음)"))
+with opt3:
+    page = st.number_input(f"페이지 (1~{n_pages})", min_value=1, max_value=n_pages, step=1, key="dict_page")
 
-    video = pick_video(item.get("videos", []))
-    if video:
-        thumb = get_youtube_thumbnail(video)
+# 현재 페이지 키만 잘라 사전에서 꺼냄 (검색 결과 전체를 dict로 만들지 않음)
+page_keys = [key for key in keys[(page - 1) * page_size: page * page_size] if key in merged]
 
-        if thumb:
-            st.image(thumb, width=350)  # 🔥 여기서 크기 조절 (350~500 추천)
+st.write(
+    f"총 **{len(keys)}개** 용어 중 "
+    f"{(page - 1) * page_size + 1 if page_keys else 0}~{(page - 1) * page_size + len(page_keys)}번째 표시"
+)
 
-        st.markdown(f"👉 **[영상 보기]({video})**", unsafe_allow_html=True)
-    else:
-        st.info("📌 해당 용어와 연결된 영상이 없습니다.")
 
-    st.markdown("<br>", unsafe_allow_html=True)
+# ----------------------------------------
+# 렌더링 (간단 목록 / 카드)
+# ----------------------------------------
+if compact:
+    # 간단 목록 (이미지 없이 markdown 한 번으로 표시)
+    lines = []
+    for key in page_keys:
+        item = merged[key]
+        line = f"- **{key}** — {item.get('name_en','')} / {item.get('name_ko','')}"
+        video = videos.get(key)
+        if video:
+            line += f" · [▶ 영상]({video['watch_url']})"
+        lines.append(line)
+    if lines:
+        st.markdown("\n".join(lines))
+else:
+    # 카드 렌더링 (썸네일 크게)
+    # 이 페이지 썸네일을 한꺼번에 로컬 캐시에 받아 둔 뒤 로컬 파일로 표시
+    THUMB_WIDTH = 350  # 🔥 여기서 크기 조절 (350~500 추천)
+    prefetch([videos[key]["video_id"] for key in page_keys if key in videos], width=THUMB_WIDTH)
+
+    for key in page_keys:
+        item = merged[key]
+        st.markdown("---")
+        st.markdown(f"## 🔹 **{key}** — {item.get('name_en','')} / {item.get('name_ko','')}")
+
+        st.write(item.get("desc_ko", "(설명 없음)"))
+
+        video = videos.get(key)
+        if video:
+            thumb = thumbnail_for(video["video_id"], width=THUMB_WIDTH)
+
+            if thumb:
+                st.image(thumb, width=THUMB_WIDTH)
+
+            st.markdown(f"👉 **[영상 보기]({video['watch_url']})**", unsafe_allow_html=True)
+        else:
+            st.info("📌 해당 용어와 연결된 영상이 없습니다.")
+
+        st.markdown("<br>", unsafe_allow_html=True)
 
 st.markdown("---")
 st.caption("※ 기본 사전 + symbols_extra.json 병합 표시됨.  ingest_youtube.py 로 추가할 수 있음.")
\ No newline at end of file
@@ -1,13 +1,15 @@
 # pages/4_필요기술_약어_설명.py
 
 import streamlit as st
-import json
 from pathlib import Path
 from collections import defaultdict
 from lib.upload_utils import uploader_with_history
+from lib import lexicon_db
+from lib.lexicon import load_lexicon
+from lib.chart_manifest import ChartManifest, ManifestError, load_manifest
+from lib.icon_index import load_icon_index
 
-from PIL import Image, ImageOps
-import numpy as np
+from PIL import Image
 import html
 import streamlit.components.v1 as components
 
@@ -16,131 +18,70 @@ import streamlit.components.v1 as components
 # 경로 설정
 # -----------------------------------------------------------------------------
 BASE_DIR = Path(__file__).resolve().parent.parent
-LIB_DIR = BASE_DIR / "lib"
-ASSETS_DIR = BASE_DIR / "assets"
-CHART_EXCEL_DIR = ASSETS_DIR / "chart_from_excel"
-CHART_MANIFEST_PATH = CHART_EXCEL_DIR / "manifest.json"
-SYMBOLS_PATH = LIB_DIR / "symbols.json"
-SYMBOLS_EXTRA_PATH = LIB_DIR / "symbols_extra.json"
 
 
 # -----------------------------------------------------------------------------
 # 데이터 로딩 유틸
 # -----------------------------------------------------------------------------
-@st.cache_data(show_spinner=False)
-def load_symbols():
-    """뜨개 약어 사전(symbols.json + symbols_extra.json) 병합."""
-    base = {}
-    extra = {}
-    if SYMBOLS_PATH.exists():
-        with SYMBOLS_PATH.open(encoding="utf-8") as f:
-            base = json.load(f)
-    if SYMBOLS_EXTRA_PATH.exists():
-        try:
-            with SYMBOLS_EXTRA_PATH.open(encoding="utf-8") as f:
-                extra = json.load(f)
-        except json.JSONDecodeError:
-            extra = {}
-    merged = {**base, **extra}
-    return merged
-
-
-@st.cache_data(show_spinner=False)
-def load_chart_manifest():
-    """엑셀에서 추출한 차트 기호 매니페스트 로드."""
-    if not CHART_MANIFEST_PATH.exists():
-        return {}
-    with CHART_MANIFEST_PATH.open(encoding="utf-8") as f:
-        manifest = json.load(f)
-    return manifest
-
-
-SYMBOLS = load_symbols()
-CHART_MAN = load_chart_manifest()
+# 사전/이름 목록은 lib/lexicon.pkl 에 미리 컴파일해 둔 것을 사용
+# (원본 JSON이 바뀌면 load_lexicon()이 알아서 다시 빌드)
+LEXICON = load_lexicon()
+SYMBOLS = LEXICON.merged
+
+# 차트 기호 매니페스트 (시트 순서/이름 정리/이미지 경로까지 lib.chart_manifest 에서 처리)
+try:
+    CHART = load_manifest()
+except ManifestError as e:
+    st.error(f"차트 기호 매니페스트 오류: {e}")
+    CHART = ChartManifest({}, "")
 
 
 # -----------------------------------------------------------------------------
 # 차트 아이콘 이미지 feature 준비 (간단한 코사인 유사도)
+#   lib/icon_index.npy 에 저장해 둔 벡터 행렬을 memory-map 으로 사용
+#   (매니페스트나 이미지가 바뀌면 바뀐 이미지만 다시 벡터화)
 # -----------------------------------------------------------------------------
-@st.cache_resource(show_spinner=False)
-def build_icon_features():
-    """chart_from_excel 아래 png들을 벡터화해서 유사도 비교에 사용."""
-    icons = []
-
-    if not CHART_MAN:
-        return icons
-
-    for sheet_title, info in CHART_MAN.items():
-        img_dir = info.get("img_dir", "")
-        items = info.get("items", [])
-
-        img_base = Path(img_dir)
-        if not img_base.is_absolute():
-            img_base = CHART_EXCEL_DIR / img_base
-
-        for it in items:
-            file = it.get("file")
-            if not file:
-                continue
-            img_path = img_base / file
-            if not img_path.exists():
-                continue
-
-            try:
-                img = Image.open(img_path).convert("L")
-            except Exception:
-                continue
-
-            # 64x64로 맞추고 벡터화
-            img_resized = ImageOps.fit(img, (64, 64))
-            arr = np.asarray(img_resized, dtype="float32") / 255.0
-            vec = arr.reshape(-1)
-            norm = float(np.linalg.norm(vec)) or 1.0
-            vec = vec / norm
-
-            icons.append(
-                {
-                    "sheet": sheet_title,
-                    "abbr": it.get("abbr", "").strip(),
-                    "desc": it.get("desc", "").strip(),
-                    "file": file,
-                    "path": str(img_path.relative_to(BASE_DIR)),
-                    "vec": vec,
-                }
-            )
-
-    return icons
-
-
-ICON_FEATURES = build_icon_features()
+ICON_INDEX = load_icon_index(CHART)
 
 
 def find_similar_icons(upload_img: Image.Image, topk: int = 5):
     """업로드한 기호 이미지와 가장 비슷한 차트 아이콘 topk 반환."""
-    if not ICON_FEATURES:
-        return []
-
-    img = upload_img.convert("L")
-    img_resized = ImageOps.fit(img, (64, 64))
-    arr = np.asarray(img_resized, dtype="float32") / 255.0
-    vec = arr.reshape(-1)
-    norm = float(np.linalg.norm(vec)) or 1.0
-    vec = vec / norm
-
-    scores = []
-    for icon in ICON_FEATURES:
-        s = float(np.dot(vec, icon["vec"]))  # cosine similarity
-        scores.append((s, icon))
-
-    scores.sort(key=lambda x: x[0], reverse=True)
-    return scores[:topk]
+    return ICON_INDEX.search(upload_img, topk=topk)
 
 
 # -----------------------------------------------------------------------------
 # 텍스트에서 약어 / 차트 기호 이름 찾기
 # -----------------------------------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def open_db():
+    """lib/lexicon.db 가 있으면 (python lib/lexicon_db.py init) SQLite 라벨 표로 검색."""
+    return lexicon_db.connect() if lexicon_db.is_enabled() else None
+
+
 def extract_abbr_from_text(text: str):
-    """입력 텍스트에서 뜨개 약어/용어 찾기."""
+    """입력 텍스트에서 뜨개 약어/용어 찾기 (DB가 있어도 dict 검색과 같은 부분 문자열 기준)."""
+    db = open_db()
+    if db is not None:
+        # 원본 JSON이 바뀌었으면 DB를 사전과 같게 맞춘 뒤 라벨 표를 한 번에 조회
+        lexicon_db.ensure_synced(db, LEXICON)
+        hits = []
+        seen = set()
+        for label, key in lexicon_db.find_labels(db, text):
+            v = SYMBOLS.get(key)
+            if v is None or key in seen:
+                continue
+            seen.add(key)
+            hits.append(
+                {
+                    "label": label,
+                    "key": key,
+                    "name_en": v.get("name_en", ""),
+                    "name_ko": v.get("name_ko", ""),
+                    "desc": v.get("desc_ko", ""),
+                }
+            )
+        return hits
+
     t = text.lower()
     hits = []
 
@@ -172,59 +113,26 @@ def extract_abbr_from_text(text: str):
 
 def extract_chart_names_from_text(text: str):
     """입력 텍스트에서 차트 기호 이름(엑셀상의 이름) 찾기."""
-    if not CHART_MAN:
-        return []
-
     t = text.lower()
     hits = []
 
-    for sheet_title, info in CHART_MAN.items():
-        items = info.get("items", [])
-        for it in items:
-            abbr = (it.get("abbr") or "").strip()
-            if not abbr:
-                continue
-            if abbr.lower() in t:
-                hits.append(
-                    {
-                        "sheet": sheet_title,
-                        "abbr": abbr,
-                        "desc": it.get("desc", ""),
-                        "file": it.get("file", ""),
-                    }
-                )
+    for it in CHART.items:
+        if it.abbr and it.abbr.lower() in t:
+            hits.append(
+                {
+                    "sheet": it.sheet,
+                    "abbr": it.abbr,
+                    "desc": it.desc,
+                    "file": it.file,
+                }
+            )
 
     return hits
 
 
-# 프롬프트에 넣을 이름 목록 생성
-def make_symbol_name_list():
-    names = set()
-    for k, v in SYMBOLS.items():
-        names.add(k)
-        names.add(v.get("name_en", ""))
-        names.add(v.get("name_ko", ""))
-        for a in v.get("aliases", []):
-            names.add(a)
-    names = {n.strip() for n in names if n and n.strip()}
-    return sorted(names)
-
-
-def make_chart_name_list():
-    names = set()
-    for _, info in CHART_MAN.items():
-        for it in info.get("items", []):
-            abbr = (it.get("abbr") or "").strip()
-            if not abbr:
-                continue
-            if abbr.startswith("__dummy__"):
-                continue
-            names.add(abbr)
-    return sorted(names)
-
-
-SYMBOL_NAME_LIST = make_symbol_name_list()
-CHART_NAME_LIST = make_chart_name_list()
+# 프롬프트에 넣을 이름 목록 (빌드 시 정렬까지 끝난 목록)
+SYMBOL_NAME_LIST = LEXICON.symbol_names
+CHART_NAME_LIST = LEXICON.chart_names
 
 
 # -----------------------------------------------------------------------------
@@ -344,7 +252,7 @@ if uploaded_icon is not None:
         st.markdown("**업로드한 기호 이미지**")
         st.image(img, use_column_width=False, width=260)
 
-        if not ICON_FEATURES:
+        if not len(ICON_INDEX):
             st.warning("차트 아이콘 인덱스를 찾지 못했습니다. (manifest.json 또는 PNG 경로를 확인해 주세요.)")
         else:
             icon_matches = find_similar_icons(img, topk=6)
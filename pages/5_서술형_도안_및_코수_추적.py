@@ -1,8 +1,9 @@
 # pages/5_서술형_도안_및_코수_추적.py
 
 import streamlit as st
-import re
 from typing import Dict, Tuple
+from lib import parser
+from lib.lexicon import load_lexicon, lexicon_version
 from lib.upload_utils import uploader_with_history
 from lib.pdf_utils import extract_pdf_text
 
@@ -27,7 +28,8 @@ st.markdown("""
 - **k2tog, ssk, ssp, p2tog 등 2코 모아뜨기** → -1 감소
 - **k3tog, p3tog 등 3코 모아뜨기** → -2 감소
 - **반복 표현**  
-  - “3회 반복”, “3번 반복”, “×3”, “3 times”, “\* ~ \* 반복” 모두 반복 횟수 적용
+  - “3회 반복”, “3번 반복”, 줄 끝의 “×3”, “3 times” → 줄 전체에 반복 횟수 적용
+  - “\* ~ \*”, “[ ~ ]”, “( ~ )” 바로 뒤의 반복 표기 → 해당 묶음만 반복
 """)
 
 
@@ -67,60 +69,26 @@ line_text = st.text_area("✏️ 도안 한 줄 입력", height=120)
 
 # ------------------------------
 # 코 수 변화 계산 규칙
+#   symbols.json / symbols_extra.json 의 delta 값을 lib.parser 와 같은 표로 사용
+#   (반복 표현은 lib.parser 의 파서가 처리)
+#   사전이 바뀌면(수집 스크립트 실행 등) 다음 재실행에서 새 표로 바뀜
 # ------------------------------
-INC_PATTERNS = ["yo", "m1l", "m1r", "yo."]
-DEC1_PATTERNS = ["k2tog", "ssk", "ssp", "p2tog"]
-DEC2_PATTERNS = ["k3tog", "p3tog"]
-
-# 반복 패턴 인식
-REPEAT_PATTERNS = [
-    r"(\d+)\s*회\s*반복",      # 3회 반복
-    r"(\d+)\s*번\s*반복",      # 3번 반복
-    r"×\s*(\d+)",              # ×3
-    r"x\s*(\d+)",              # x3
-    r"(\d+)\s*times"           # 3 times
-]
+DELTA_TABLE = load_lexicon().deltas
+LEXICON_VERSION = lexicon_version()
 
 
 def count_st_changes(text: str) -> Tuple[int, Dict[str, int]]:
     """도안 한 줄의 총 증가/감소 코 수 계산"""
 
-    delta = 0
-    detail = {}
-
-    # 1) 반복 횟수 찾기
-    repeat = 1
-    for pat in REPEAT_PATTERNS:
-        m = re.search(pat, text, flags=re.IGNORECASE)
-        if m:
-            repeat = int(m.group(1))
-            break
-
-    # 2) 요소별 계산
-    lowered = text.lower()
-
-    # 증가 (+1)
-    for inc in INC_PATTERNS:
-        c = lowered.count(inc)
-        if c:
-            detail[inc] = c * repeat
-            delta += c * repeat * 1
+    tree = parser.parse_cached(text, DELTA_TABLE)
+    res = parser.count_tree(tree, 0, DELTA_TABLE)
 
-    # 2코 모아뜨기 (-1)
-    for d in DEC1_PATTERNS:
-        c = lowered.count(d)
-        if c:
-            detail[d] = c * repeat
-            delta -= c * repeat * 1
-
-    # 3코 모아뜨기 (-2)
-    for d in DEC2_PATTERNS:
-        c = lowered.count(d)
-        if c:
-            detail[d] = c * repeat
-            delta -= c * repeat * 2
-
-    return delta, detail
+    # 코 수가 바뀌는 토큰만 상세 표시
+    detail = {
+        tok: n for tok, n in res["by_token"].items()
+        if DELTA_TABLE.delta(tok)
+    }
+    return res["delta"], detail
 
 
 if st.button("🧮 코 수 계산하기", type="primary"):
@@ -138,15 +106,65 @@ if st.button("🧮 코 수 계산하기", type="primary"):
 
         with st.expander("🔍 상세 계산 보기"):
             for k, v in detail.items():
-                sign = "+" if k in INC_PATTERNS else "-"
-                st.write(f"• {k} × {v} → {sign}{v}")
+                st.write(f"• {k} × {v} → {DELTA_TABLE.delta(k) * v:+}")
+
+
+# ============================================================
+# 3️⃣ 여러 단 도안 코 수 추적 (단마다 끝 코 수를 다음 단으로 이어 계산)
+# ============================================================
+
+st.header("3️⃣ 여러 단 도안 코 수 추적")
+
+st.markdown("""
+한 줄에 한 단씩 붙여넣으면, 위의 **시작 코 수**부터 단마다 끝 코 수를 이어서 계산합니다.  
+줄 끝에 `(60 sts)`, `- 60코`처럼 코 수가 적혀 있으면 계산 결과와 맞는지도 확인합니다.
+""")
+
+rows_text = st.text_area("📜 도안 (한 줄 = 한 단)", height=220, key="rows_text")
+
+# 재실행마다 새로 만들지 않고 세션에 유지 → 바뀐 단부터만 다시 계산
+# (사전 버전이 바뀌면 단별 결과가 달라질 수 있으므로 새로 만듦)
+if st.session_state.get("stitch_tracker_version") != LEXICON_VERSION:
+    st.session_state["stitch_tracker"] = parser.StitchTracker(start_sts, DELTA_TABLE)
+    st.session_state["stitch_tracker_version"] = LEXICON_VERSION
+tracker = st.session_state["stitch_tracker"]
+tracker.set_start(start_sts)
+tracker.set_rows([ln for ln in rows_text.splitlines() if ln.strip()])
+
+if len(tracker):
+    results = tracker.results()
+    mismatches = [r for r in results if r["ok"] is False]
+
+    st.write(f"- 총 **{len(results)}단**, 마지막 단 끝 코 수: **{results[-1]['end']}코**")
+    if mismatches:
+        st.warning(
+            "도안에 적힌 코 수와 계산 결과가 다른 단: "
+            + ", ".join(f"{r['row']}단({r['stated']}코 ≠ {r['end']}코)" for r in mismatches)
+        )
+
+    st.dataframe(
+        [
+            {
+                "단": r["row"],
+                "도안": r["text"],
+                "시작": r["start"],
+                "변화": f"{r['delta']:+}",
+                "끝": r["end"],
+                "도안 표기": "" if r["stated"] is None else r["stated"],
+                "확인": "" if r["ok"] is None else ("✅" if r["ok"] else "❌"),
+            }
+            for r in results
+        ],
+        use_container_width=True,
+        hide_index=True,
+    )
 
 
 # ============================================================
-# 3️⃣ ChatGPT에게 물어볼 때 쓸 프롬프트 만들기 (최종 정제 버전)
+# 4️⃣ ChatGPT에게 물어볼 때 쓸 프롬프트 만들기 (최종 정제 버전)
 # ============================================================
 
-st.header("3️⃣ ChatGPT 프롬프트 생성기")
+st.header("4️⃣ ChatGPT 프롬프트 생성기")
 
 st.markdown("""
 ✔ **프롬프트에는 두 가지 정보만 포함됩니다.**  
@@ -0,0 +1,72 @@
+# tests/test_chart_atlas.py
+
+import os
+
+import pytest
+from PIL import Image
+
+from lib import chart_atlas
+from lib.chart_manifest import ChartManifest
+
+
+def _png(path, height, color):
+    Image.new("RGB", (55, height), color).save(path)
+
+
+@pytest.fixture
+def manifest(tmp_path, monkeypatch):
+    """시트 두 장 (홀수 높이 아이콘 포함) + 임시 아틀라스 폴더"""
+    data = {}
+    for n, sheet in enumerate(("1코 기호", "2코 교차뜨기")):
+        img_dir = tmp_path / f"imgs{n}"
+        img_dir.mkdir()
+        items = []
+        for i, height in enumerate((37, 50, 23)):
+            name = f"chart_{i:03d}.png"
+            _png(img_dir / name, height, (40 * i, 100, 200))
+            items.append({"file": name, "abbr": name, "desc": ""})
+        data[sheet] = {"img_dir": str(img_dir), "items": items}
+
+    atlas_dir = tmp_path / "atlas"
+    monkeypatch.setattr(chart_atlas, "ATLAS_DIR", atlas_dir)
+    monkeypatch.setattr(chart_atlas, "INDEX_PATH", atlas_dir / "index.json")
+    monkeypatch.setattr(chart_atlas, "_LOADED", {})
+    monkeypatch.setattr(chart_atlas, "_SOURCE_FP", {})
+    return ChartManifest(data, "digest", tmp_path / "manifest.json")
+
+
+def test_offsets_are_contiguous_display_pixels(manifest):
+    chart_atlas.build_atlas(manifest)
+    atlases = chart_atlas.load_atlas(manifest)
+    assert set(atlases) == set(manifest.sheets)
+
+    for atlas in atlases.values():
+        y = 0
+        for _, (top, height) in sorted(atlas.offsets.items(), key=lambda kv: kv[1][0]):
+            assert top == y
+            y += height
+        assert y == atlas.height
+        with Image.open(atlas.path) as img:
+            assert img.size == (chart_atlas.DISPLAY_WIDTH * chart_atlas.SCALE, atlas.height * chart_atlas.SCALE)
+
+
+def test_changed_source_image_drops_its_sheet(manifest):
+    chart_atlas.build_atlas(manifest)
+    assert len(chart_atlas.load_atlas(manifest)) == 2
+
+    changed = manifest.sheets["1코 기호"].items[1].path
+    _png(changed, 50, (255, 0, 0))          # 같은 크기의 다른 그림
+    st = changed.stat()
+    os.utime(changed, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+    assert set(chart_atlas.load_atlas(manifest)) == {"2코 교차뜨기"}
+    chart_atlas.build_atlas(manifest)
+    assert len(chart_atlas.load_atlas(manifest)) == 2
+
+
+def test_touched_but_unchanged_image_keeps_sheet(manifest):
+    chart_atlas.build_atlas(manifest)
+    path = manifest.sheets["1코 기호"].items[0].path
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert len(chart_atlas.load_atlas(manifest)) == 2
@@ -0,0 +1,48 @@
+# tests/test_chart_manifest.py
+
+import json
+
+import pytest
+
+from lib.chart_manifest import ChartManifest, ManifestError, clean_name, load_manifest, validate
+
+
+@pytest.mark.parametrize("data", [
+    [],
+    {"1코 기호": "not a dict"},
+    {"1코 기호": {"img_dir": 3, "items": []}},
+    {"1코 기호": {"img_dir": "x", "items": {}}},
+    {"1코 기호": {"img_dir": "x", "items": ["chart_001.png"]}},
+    {"1코 기호": {"img_dir": "x", "items": [{"file": "a.png", "abbr": 12, "desc": ""}]}},
+])
+def test_validate_rejects_malformed(data):
+    with pytest.raises(ManifestError):
+        validate(data)
+
+
+def test_manifest_orders_sheets_and_cleans_names(tmp_path):
+    data = {
+        "노트뜨기": {"img_dir": str(tmp_path), "items": []},
+        "1코 기호": {"img_dir": str(tmp_path), "items": [
+            {"file": "chart_001.png", "abbr": " chart_001.png (겉뜨기) ", "desc": "겉뜨기"},
+            {"file": "chart_002.png", "abbr": "SSK", "desc": "오른코 겹쳐 2코 모아뜨기"},
+        ]},
+    }
+    m = ChartManifest(data, "digest", tmp_path / "manifest.json")
+    assert m.sheet_names == ["1코 기호", "노트뜨기"]
+    assert [it.label for it in m.items] == ["겉뜨기", "SSK (오른코 겹쳐 2코 모아뜨기)"]
+    assert m.items[0].path == tmp_path / "chart_001.png"
+    assert clean_name("chart_022.png(M1R)") == "M1R"
+
+
+def test_load_manifest_errors_and_cache(tmp_path):
+    path = tmp_path / "manifest.json"
+    assert len(load_manifest(path)) == 0
+
+    path.write_text("{broken", encoding="utf-8")
+    with pytest.raises(ManifestError):
+        load_manifest(path)
+
+    path.write_text(json.dumps({"1코 기호": {"img_dir": "", "items": []}}), encoding="utf-8")
+    first = load_manifest(path)
+    assert load_manifest(path) is first
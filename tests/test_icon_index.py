@@ -0,0 +1,79 @@
+# tests/test_icon_index.py
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from lib import icon_index
+from lib.chart_manifest import ChartManifest
+
+
+def _icon(path, n):
+    img = Image.new("L", (40, 40), 255)
+    ImageDraw.Draw(img).rectangle([n * 5, 4, n * 5 + 8, 30], fill=0)
+    img.save(path)
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    """아이콘 3장짜리 매니페스트 + icon_vector 호출 횟수"""
+    img_dir = tmp_path / "imgs"
+    img_dir.mkdir()
+    items = []
+    for n in range(3):
+        _icon(img_dir / f"chart_{n:03d}.png", n)
+        items.append({"file": f"chart_{n:03d}.png", "abbr": f"icon{n}", "desc": ""})
+    manifest = ChartManifest({"1코 기호": {"img_dir": str(img_dir), "items": items}},
+                             "digest", tmp_path / "manifest.json")
+
+    calls = []
+    real = icon_index.icon_vector
+    monkeypatch.setattr(icon_index, "icon_vector", lambda img: calls.append(1) or real(img))
+    monkeypatch.setattr(icon_index, "_LOADED", None)
+
+    def load():
+        icon_index._LOADED = None       # 새 프로세스처럼 디스크에서 읽기
+        calls.clear()
+        return icon_index.load_icon_index(manifest, tmp_path / "icons.npy", tmp_path / "icons.meta.npz")
+
+    return manifest, img_dir, calls, load
+
+
+def test_saved_index_reloads_through_mmap(setup, tmp_path):
+    manifest, _, calls, load = setup
+    built = load()
+    assert len(built) == 3 and len(calls) == 3
+
+    reloaded = load()
+    assert calls == []
+    assert not reloaded.matrix.flags.writeable      # 읽기 전용 memory-map (복사본 아님)
+    np.testing.assert_array_equal(reloaded.matrix, built.matrix)
+    # 키별 행렬 한 개 + 메타만 남고 임시 파일은 없음
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_file()) == [
+        icon_index._matrix_file(tmp_path / "icons.npy", icon_index.index_key(manifest)).name,
+        "icons.meta.npz",
+    ]
+
+
+def test_only_changed_image_is_revectorized(setup):
+    manifest, img_dir, calls, load = setup
+    load()
+    changed = img_dir / "chart_001.png"
+    _icon(changed, 5)
+    st = changed.stat()
+    os.utime(changed, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+    index = load()
+    assert len(calls) == 1
+    np.testing.assert_allclose(index.matrix, icon_index.build_icon_index(manifest).matrix)
+    assert load() is not None and calls == []
+
+
+def test_corrupt_meta_rebuilds(setup, tmp_path):
+    _, _, calls, load = setup
+    load()
+    (tmp_path / "icons.meta.npz").write_bytes(b"not a zip")
+    index = load()
+    assert len(index) == 3 and len(calls) == 3
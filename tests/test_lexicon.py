@@ -0,0 +1,94 @@
+# tests/test_lexicon.py
+
+import json
+import os
+
+import pytest
+
+from lib import lexicon
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+def _bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    """임시 원본 JSON + build_lexicon 호출 횟수"""
+    base, extra = tmp_path / "symbols.json", tmp_path / "symbols_extra.json"
+    _write(base, {"k": {"name_en": "Knit", "name_ko": "겉뜨기", "delta": 0}})
+    _write(extra, {"yo": {"name_en": "Yarn over", "delta": 1}})
+    paths = {
+        "BASE_PATH": base,
+        "EXTRA_PATH": extra,
+        "OVERRIDES_PATH": tmp_path / "video_overrides.json",
+        "CHART_MANIFEST_PATH": tmp_path / "manifest.json",
+    }
+    for name, path in paths.items():
+        monkeypatch.setattr(lexicon, name, path)
+    monkeypatch.setattr(lexicon, "SOURCES", {
+        "base": base, "extra": extra,
+        "overrides": paths["OVERRIDES_PATH"], "chart_manifest": paths["CHART_MANIFEST_PATH"],
+    })
+    monkeypatch.setattr(lexicon, "ARTIFACT_PATH", tmp_path / "lexicon.pkl")
+
+    builds = []
+    real = lexicon.build_lexicon
+    monkeypatch.setattr(lexicon, "build_lexicon", lambda: builds.append(1) or real())
+    return extra, tmp_path / "lexicon.pkl", builds
+
+
+def test_source_edit_bumps_version_and_clears_derived(sources):
+    extra, artifact, builds = sources
+    store = lexicon.LexiconStore(artifact)
+    made = []
+    factory = lambda lex: made.append(lex) or sorted(lex.merged)
+
+    assert store.derived("keys", factory) == ["k", "yo"]
+    assert store.derived("keys", factory) == ["k", "yo"]
+    v1 = store.version
+    assert len(made) == 1 and artifact.exists()
+
+    _write(extra, {"yo": {"name_en": "Yarn over", "delta": 1}, "m1": {"name_en": "Make one", "delta": 1}})
+    _bump_mtime(extra)
+    assert store.derived("keys", factory) == ["k", "m1", "yo"]
+    assert store.version == v1 + 1 and len(made) == 2 and len(builds) == 2
+
+
+def test_mtime_only_change_does_not_rebuild(sources):
+    extra, artifact, builds = sources
+    lexicon.LexiconStore(artifact).get()
+    _bump_mtime(extra)
+
+    # 새 프로세스처럼 디스크의 pickle 에서 시작
+    lex = lexicon.LexiconStore(artifact).get()
+    assert len(builds) == 1
+    assert lex.sources["extra"][0] == extra.stat().st_mtime_ns
+    assert "yo" in lex.merged
+
+
+def test_half_written_json_keeps_previous_lexicon(sources):
+    extra, artifact, builds = sources
+    store = lexicon.LexiconStore(artifact)
+    before = store.get()
+    version = store.version
+
+    extra.write_text('{"yo": {"name_en": ', encoding="utf-8")
+    _bump_mtime(extra)
+    assert store.get() is before
+    assert store.version == version
+
+
+def test_stale_artifact_version_is_ignored(sources, monkeypatch):
+    _, artifact, builds = sources
+    lexicon.LexiconStore(artifact).get()
+    monkeypatch.setattr(lexicon, "ARTIFACT_VERSION", lexicon.ARTIFACT_VERSION + 1)
+
+    lex = lexicon.LexiconStore(artifact).get()
+    assert len(builds) == 2
+    assert lex.version == lexicon.ARTIFACT_VERSION
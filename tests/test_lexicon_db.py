@@ -0,0 +1,61 @@
+# tests/test_lexicon_db.py
+
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from lib import lexicon_db
+from lib.term_index import SearchIndex
+
+
+def _load(name):
+    return json.loads((lexicon_db.BASE / name).read_text(encoding="utf-8"))
+
+
+def test_db_search_ranks_like_search_index(tmp_path):
+    base, extra = _load("symbols.json"), _load("symbols_extra.json")
+    merged = {**base, **extra}
+    conn = lexicon_db.connect(tmp_path / "lexicon.db")
+    lexicon_db.sync(conn, merged, extra.keys())
+    index = SearchIndex(merged, extra.keys())
+
+    assert lexicon_db.search(conn, "cast on")[0] == "Cast on"
+    assert lexicon_db.search(conn, "모아뜨기")[0] == "Tog"
+    for q in ("cast on", "모아뜨기", "ssk", "k", "tbl", "st"):
+        assert lexicon_db.search(conn, q) == index.search(q)
+
+    labels = dict(lexicon_db.find_labels(conn, "ssk 2회"))
+    assert labels.get("SSK") == "SSK"
+
+
+def test_init_aborts_on_half_written_json(tmp_path, monkeypatch, capsys):
+    base, extra = tmp_path / "symbols.json", tmp_path / "symbols_extra.json"
+    base.write_text('{"k": {"name_en": "Knit"}}', encoding="utf-8")
+    extra.write_text('{"yo": {"name_en": ', encoding="utf-8")
+    monkeypatch.setattr(lexicon_db, "SYMBOLS_PATH", base)
+    monkeypatch.setattr(lexicon_db, "EXTRA_PATH", extra)
+    monkeypatch.setattr(lexicon_db, "connect", lambda *a, **kw: pytest.fail("DB를 건드리면 안 됨"))
+    monkeypatch.setattr(sys, "argv", ["lexicon_db.py", "init"])
+
+    with pytest.raises(SystemExit):
+        lexicon_db.main()
+    assert "동기화하지 않았습니다" in capsys.readouterr().out
+
+
+def test_concurrent_ensure_synced_syncs_once(tmp_path, monkeypatch):
+    class Lex:
+        sources = {"base": (1, 2, "abc")}
+        merged = _load("symbols.json")
+        extra_keys = frozenset()
+
+    conn = lexicon_db.connect(tmp_path / "lexicon.db")
+    syncs = []
+    real = lexicon_db.sync
+    monkeypatch.setattr(lexicon_db, "sync", lambda *a: syncs.append(1) or real(*a))
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        done = list(ex.map(lambda _: lexicon_db.ensure_synced(conn, Lex), range(8)))
+    assert done.count(True) == 1 and len(syncs) == 1
+    assert lexicon_db.search(conn, "ssk")[0] == "SSK"
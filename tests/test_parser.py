@@ -0,0 +1,145 @@
+# tests/test_parser.py
+
+from lib import parser
+
+
+def test_korean_two_stitch_decrease_is_minus_one():
+    table = parser.load_delta_table()
+    for line in ("오른코 모아뜨기", "2코 모아뜨기"):
+        assert parser.count_tree(parser.parse_sequence(line, table), 0, table)["delta"] == -1
+    tree = parser.parse_sequence("왼코 모아뜨기 3회 반복", table)
+    assert parser.count_tree(tree, 0, table)["delta"] == -3
+
+
+def test_resolve_term_basic_stitches():
+    parser.load_lib("symbols.json")
+    for q, key in (("knit", "k"), ("Knit", "k"), ("purl", "p"), ("Purl", "p")):
+        m = parser.resolve_term(q)
+        assert (m.key, m.tier) == (key, "exact")
+    # 단어 경계 접두어가 한 항목에만 있을 때만 접두어 단계에서 답함
+    m = parser.resolve_term("knit through")
+    assert (m.key, m.tier) == ("ktbl", "prefix") and m.score < 100
+    assert parser.resolve_term("kn").tier != "prefix"
+    assert parser.resolve_term("back").tier != "prefix"
+
+
+def test_ngram_ties_keep_first_entry():
+    from lib.term_index import NgramIndex
+
+    idx = NgramIndex([("오른코 모아뜨기", "SSK"), ("오른코 모아뜨기", "SSP")])
+    assert [k for _, k, _ in idx.search("오른코 모아뜨기")] == ["SSK", "SSP"]
+
+
+def test_nested_groups_repeat_as_trees():
+    tree = parser.parse_sequence("[k2, [p1, k1] x 2, p1] x 2")
+    assert len(tree.items) == 1 and tree.items[0].times == 2
+    assert parser.expand_sequence("[k2, [p1, k1] x 2, p1] x 2") == ["k", "k", "p", "k", "p", "k", "p"] * 2
+
+
+def test_repeat_notations():
+    assert parser.expand_sequence("*k2, p2* 3회") == ["k", "k", "p", "p"] * 3
+    assert parser.expand_sequence("(k1, p1) 2번 반복") == ["k", "p"] * 2
+    assert parser.expand_sequence("[k1, p1] ×3") == ["k", "p"] * 3
+    assert parser.expand_sequence("k1, p1 3회 반복, k2") == ["k", "p"] * 3 + ["k", "k"]
+
+
+def test_trailing_repeat_covers_line_mid_line_repeat_covers_item():
+    assert parser.expand_sequence("k2tog, yo x3") == ["k2tog", "yo"] * 3
+    assert parser.expand_sequence("k2tog x3, yo") == ["k2tog"] * 3 + ["yo"]
+    # 그룹 안에서도 같은 규칙: 그룹 끝의 x2는 그룹 본문 전체, 중간의 x2는 그 항목만
+    assert parser.expand_sequence("[k1, p2tog x2] x2") == ["k", "p2tog"] * 4
+    assert parser.expand_sequence("[p2tog x2, k1] x2") == ["p2tog", "p2tog", "k"] * 2
+
+
+def test_unmatched_stars_and_brackets_are_plain_sequences():
+    assert parser.expand_sequence("*k1, p1, k2") == ["k", "p", "k", "k"]
+    assert parser.expand_sequence("[k1, p1") == ["k", "p"]
+    assert parser.expand_sequence("k1] p1") == ["k", "p"]
+    assert parser.expand_sequence("x3, k1") == ["k"]
+
+
+def test_iter_spans_point_into_source():
+    s = "k2, [p1] x 2, yo"
+    spans = list(parser.iter_spans(parser.parse_sequence(s)))
+    assert [tok for tok, _ in spans] == parser.expand_sequence(s)
+    assert [s[a:b] for _, (a, b) in spans] == ["k2", "k2", "p1", "p1", "yo"]
+
+
+def test_count_tree_matches_expanded_counts():
+    table = parser.load_delta_table()
+    tree = parser.parse_sequence("[k2, m1, [k1, k2tog] x 2] x 3, yo", table)
+    tokens = list(tree)
+    tally = parser.count_tree(tree, 10, table)
+    from_tree = parser.compute_counts(tree, 10, table)
+    from_list = parser.compute_counts(tokens, 10, table)
+
+    assert tally["stitches"] == len(tokens) == len(from_tree) == len(from_list)
+    assert from_tree.tolist() == from_list.tolist()
+    assert tally["expected_end"] == from_list[-1][2] == 10 + sum(table.delta(t) for t in tokens)
+    assert tally["by_token"] == {t: tokens.count(t) for t in set(tokens)}
+    assert [r["times"] for r in tally["repeats"]] == [3, 2]
+
+
+def _tracker_ends(tracker):
+    return [r["end"] for r in tracker.results()]
+
+
+def test_stitch_tracker_recomputes_from_first_changed_row():
+    table = parser.load_delta_table()
+    rows = ["k2, m1, k2", "k2tog, k3", "k5", "yo, k5"]
+    tracker = parser.StitchTracker(10, table, rows)
+    assert _tracker_ends(tracker) == [11, 10, 10, 11]
+
+    assert tracker.recomputed == 4
+
+    tracker.set_rows(["k2, m1, k2", "k2tog, k3", "k2tog, k3", "yo, k5"])
+    assert _tracker_ends(tracker) == [11, 10, 9, 10]
+    assert tracker.recomputed == 2            # 앞의 두 단은 그대로
+
+    # 대소문자/공백만 바뀌면 다시 계산하지 않고 표시용 원문만 갱신
+    tracker.set_rows(["K2,  M1, k2", "k2tog, k3", "k2tog, k3", "yo, k5"])
+    assert tracker.results()[0]["text"] == "K2,  M1, k2"
+    assert tracker.recomputed == 0
+
+
+def test_stitch_tracker_update_append_and_start():
+    table = parser.load_delta_table()
+    tracker = parser.StitchTracker(10, table, ["k10", "k2tog, k8"])
+    assert _tracker_ends(tracker) == [10, 9]
+
+    tracker.update(1, "yo, k10")
+    assert _tracker_ends(tracker) == [10, 11]
+    assert tracker.recomputed == 1
+
+    tracker.append("[k2tog] x 2, k7")
+    res = tracker.results()
+    assert tracker.recomputed == 1
+    assert (res[2]["row"], res[2]["start"], res[2]["end"]) == (3, 11, 9)
+
+    tracker.set_start(20)
+    assert _tracker_ends(tracker) == [20, 21, 19]
+    assert tracker.recomputed == 3
+
+
+def test_stitch_tracker_stated_counts():
+    table = parser.load_delta_table()
+    rows = [
+        "k2, m1, k8 (11 sts)",
+        "k11 [11코]",
+        "k2tog, k9 - 10코",
+        "k10 = 12 sts",
+        "겉뜨기 2코, 안뜨기 2코",
+        "k10",
+    ]
+    res = parser.StitchTracker(10, table, rows).results()
+    assert [r["stated"] for r in res] == [11, 11, 10, 12, None, None]
+    assert [r["ok"] for r in res] == [True, True, True, False, None, None]
+
+
+def test_stitch_tracker_stated_count_does_not_change_parse():
+    table = parser.load_delta_table()
+    rows = ["k2tog, yo x3", "k2tog, yo x3 (10 sts)", "k2tog, yo x3 - 10코", "k2tog, yo x3 = 10 sts"]
+    res = parser.StitchTracker(10, table, rows).results()
+    assert [r["delta"] for r in res] == [0, 0, 0, 0]
+    assert [r["stitches"] for r in res] == [6, 6, 6, 6]
+    assert [r["ok"] for r in res] == [None, True, True, True]
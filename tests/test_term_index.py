@@ -0,0 +1,29 @@
+# tests/test_term_index.py
+
+from lib.term_index import SearchIndex, _bits, _to_bitset
+
+
+def test_bitset_round_trip():
+    ids = [0, 3, 7, 8, 63, 64, 1000]
+    assert _bits(_to_bitset(ids)) == ids
+    assert _bits(0) == [] and _to_bitset([]) == 0
+
+
+def test_search_index_tiers_and_listing():
+    entries = {
+        "k": {"name_en": "Knit", "aliases": ["knit stitch"]},
+        "k2tog": {"name_en": "Knit two together", "desc_ko": "2코 모아뜨기"},
+        "kwise": {"name_en": "Knitwise", "aliases": ["k-wise"]},
+        "ssk": {"name_en": "Slip slip knit"},
+        "yo": {"name_en": "Yarn over", "desc_ko": "knit 전에 실 걸기"},
+    }
+    index = SearchIndex(entries, extra_keys=["ssk", "yo"], videos={"k": "x", "yo": "y"})
+
+    assert index.search("knit") == ["k", "k2tog", "kwise", "ssk", "yo"]
+    assert index.search("k")[:3] == ["k", "k2tog", "kwise"]
+    assert index.search("") == list(entries)
+    assert index.search("", only_extra=True) == ["ssk", "yo"]
+    assert index.search("", only_extra=True, only_video=True) == ["yo"]
+    # 캐시된 목록을 호출한 쪽에서 고쳐도 다음 결과는 그대로
+    index.search("").append("zz")
+    assert index.search("") == list(entries)
@@ -0,0 +1,97 @@
+# tests/test_thumbnails.py
+
+import io
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+from lib import thumbnails
+
+
+def _jpeg(color, size=(480, 360)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+IMAGES = {"vid_a": _jpeg((200, 30, 30)), "vid_b": _jpeg((30, 200, 30))}
+
+
+@pytest.fixture
+def origin(tmp_path, monkeypatch):
+    """로컬 썸네일 서버 (/vi/<id>/hqdefault.jpg) + 임시 캐시 폴더, 요청 경로 목록을 돌려줌"""
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            parts = self.path.strip("/").split("/")
+            body = IMAGES.get(parts[1]) if len(parts) == 3 else None
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(thumbnails, "THUMB_ORIGIN", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(thumbnails, "CACHE_DIR", tmp_path / "thumbs")
+    monkeypatch.setattr(thumbnails, "_FAILED", {})
+    monkeypatch.setattr(thumbnails, "_CACHE_BYTES", None)
+    yield requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_writes_resized_webp_then_hits_cache(origin):
+    path = thumbnails.cached_thumbnail("vid_a", width=120)
+    assert path is not None and path.suffix == ".webp"
+    with Image.open(path) as img:
+        assert img.format == "WEBP" and img.size == (120, 90)
+    assert origin == ["/vi/vid_a/hqdefault.jpg"]
+
+    assert thumbnails.thumbnail_for("vid_a", width=120) == str(path)
+    thumbnails.prefetch(["vid_a"], width=120)
+    assert len(origin) == 1
+
+
+def test_failed_fetch_falls_back_to_remote_url_without_retry(origin):
+    url = thumbnails.remote_url("missing")
+    assert thumbnails.thumbnail_for("missing") == url
+    assert thumbnails.thumbnail_for("missing") == url
+    assert origin == ["/vi/missing/hqdefault.jpg"]     # RETRY_AFTER 동안 다시 요청하지 않음
+
+
+def test_evicted_file_is_fetched_again(origin):
+    path = thumbnails.cached_thumbnail("vid_a", width=120)
+    path.unlink()
+    assert thumbnails.cached_thumbnail("vid_a", width=120) == path
+    assert path.exists() and len(origin) == 2
+
+
+def test_evict_removes_least_recently_used_down_to_80_percent(tmp_path, monkeypatch):
+    cache = tmp_path / "thumbs"
+    cache.mkdir()
+    monkeypatch.setattr(thumbnails, "CACHE_DIR", cache)
+    monkeypatch.setattr(thumbnails, "_CACHE_BYTES", None)
+    files = []
+    for i in range(10):
+        p = cache / f"{i:040x}_350.webp"
+        p.write_bytes(b"x" * 100)
+        os.utime(p, (1000 + i, 1000 + i))      # 0번이 가장 오래 안 씀
+        files.append(p)
+
+    assert thumbnails.evict(max_bytes=900) == 3      # 1000 → 700 (≤ 720)
+    assert [p.exists() for p in files] == [False] * 3 + [True] * 7
+    assert thumbnails.evict(max_bytes=900) == 0
@@ -0,0 +1,35 @@
+# tests/test_utils.py
+
+from lib.utils import pick_video_record, video_record
+
+VID = "lpFl7ElXuF0"
+
+
+def test_video_record_youtube_forms():
+    for url in (
+        f"https://www.youtube.com/watch?v={VID}&t=75",
+        f"https://youtube.com/shorts/{VID}?feature=share",
+        f"https://youtu.be/{VID}?si=0Y-QleoGDGFFomwO&t=75",
+        f"m.youtube.com/watch?v={VID}",
+    ):
+        rec = video_record({"title": "t", "url": f"  {url} "})
+        assert rec["video_id"] == VID, url
+        assert rec["watch_url"] == f"https://www.youtube.com/watch?v={VID}"
+        assert rec["thumbnail_url"] == f"https://img.youtube.com/vi/{VID}/hqdefault.jpg"
+        assert rec["url"] == url and rec["playlist_only"] is False
+
+
+def test_video_record_playlist_and_other_links():
+    playlist = "https://www.youtube.com/playlist?list=PLabcdefghijk"
+    rec = video_record({"url": playlist})
+    assert rec["playlist_only"] is True
+    assert (rec["video_id"], rec["watch_url"], rec["thumbnail_url"]) == ("", playlist, "")
+    assert rec["title"] == ""
+
+    other = "https://vimeo.com/123456789"
+    rec = video_record({"title": "v", "url": other})
+    assert (rec["video_id"], rec["watch_url"], rec["playlist_only"]) == ("", other, False)
+
+    # 재생목록 단독 링크는 건너뛰고 첫 개별 영상
+    picked = pick_video_record([video_record({"url": playlist}), video_record({"url": f"https://youtu.be/{VID}"})])
+    assert picked["video_id"] == VID